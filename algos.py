@@ -1,9 +1,26 @@
-from typing import List, Tuple, Iterable, Optional, Callable, Dict
+from typing import List, Tuple, Iterable, Iterator, Optional, Callable, Dict, Union, Collection
+from functools import lru_cache
+from itertools import islice
 import time
+from word_trie import WordTrie
+from word_index import WordIndex
 
 Board = List[List[str]]
 Path = List[Tuple[int, int]]
 
+BOARD_CONTEXT_CACHE_SIZE = 256
+
+# the search strategies of find_length_n_paths and find_length_n_words (see plan_search)
+BOARD_FIRST = "board-first"
+WORD_FIRST = "word-first"
+# estimating the cost of a word-first search is linear in the words, a bigger list is always searched board-first
+WORD_FIRST_MAX_WORDS = 50000
+# rough costs in microseconds (measured on 4x4 boards): building the trie per letter of the words,
+# starting a board-first walk from a cell, and a word-first step (a start cell times a letter of its word)
+TRIE_LETTER_COST = 1.0
+BOARD_CELL_COST = 3.0
+WORD_STEP_COST = 1.5
+
 
 def timeit(f: Callable) -> Callable:
     def wrapper(*args, **kwargs):
@@ -32,36 +49,14 @@ def is_valid_path(board: Board, path: Path, words: Iterable[str]) -> Optional[st
 
     :param board: A 2D list representing the board of the game.
     :param path: A list of coordinates (tuples) representing a path on the board.
-    :param words: An iterable collection of words to check the path against.
+    :param words: A collection of words to check the path against. Pass a set, WordTrie or WordIndex
+                  for a fast lookup, a list is scanned word by word.
     :return: The valid word on the path if the path is valid, None otherwise.
     """
-    # check 1 (in doc-str)
-    if len(set(path)) != len(path):
-        return
-
-    # Init needed data
-    available_coords, possible_moves_dict = init_partial_data(board)
-
-    # check 3 (in doc-str)
-    for step in path:
-        if step not in available_coords:
-            return
-    for step in range(len(path) - 1):
-        if path[step + 1] not in possible_moves_dict[path[step]]:
-            return
+    return board_context(board).word_on_path(path, words)
 
-    # gets the word on current path
-    word = get_word_from_path(board, path)
 
-    # check 4 (in doc-str)
-    if word not in words:
-        return
-
-    # if passed all checks
-    return word
-
-
-def find_length_n_paths(n: int, board: Board, words: Iterable[str]) -> List[Path]:
+def find_length_n_paths(n: int, board: Board, words: Iterable[str], strategy: Optional[str] = None) -> List[Path]:
     """
     Find all valid paths of length n on the board.
     A path is considered valid if:
@@ -72,70 +67,76 @@ def find_length_n_paths(n: int, board: Board, words: Iterable[str]) -> List[Path
 
     :param n: The length of the paths to find.
     :param board: A 2D list representing the board of the game.
-    :param words: An iterable collection of words to check the paths against.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :param strategy: BOARD_FIRST or WORD_FIRST, picked by plan_search if not given. Both find the same paths,
+                     in the same order (a board with empty cells is always searched board-first).
     :return: A list of valid paths of length n on the board.
     """
+    if search_strategy(board, words, strategy) == WORD_FIRST:
+        targets = [word for word in set(words) if len(word) >= n]
+        return word_first_paths(board_context(board), targets, n_cells=n)
+
     # Init needed data
-    available_coords, possible_moves_dict, words, prefix_set = init_data(board, words)
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
     all_found = list()
-    
-    # calling to the helper function for each and every coord in board
-    for coord in available_coords[:]:
-        # remove the current coord to avoid counting it as a possible move
-        available_coords.remove(coord)
-        find_length_n_paths_helper(board, n, coord, available_coords, [coord], all_found,
-                                   possible_moves_dict, words, prefix_set)
-        # return the coord to preserve the data integrity
-        available_coords.append(coord)
+    visited = bytearray(len(cell_coords))
+
+    # calling to the helper function for each and every cell in board
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        find_length_n_paths_helper(n, cell, visited, [cell], all_found,
+                                   cell_coords, cell_letters, neighbours, trie, node)
+        visited[cell] = 0
 
     return all_found
 
 
-def find_length_n_paths_helper(board, n, coord, available_coords, cur_path, all_found,
-                               possible_moves_dict, word_set, prefix_set):
+def find_length_n_paths_helper(n, cell, visited, cur_path, all_found,
+                               cell_coords, cell_letters, neighbours, trie, node):
     """
     A helper function for find_length_n_paths that recursively finds all valid paths of length n
-    on the board starting from a given coordinate.
+    on the board starting from a given cell.
 
-    :param board: A 2D list representing the board of the game.
     :param n: The length of the paths to find.
-    :param coord: The starting coordinate for the path.
-    :param available_coords: A set of coordinates that can be used in the path.
-    :param cur_path: The current path being built.
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path
+                    (updated in place, so a step costs the same on any size of board).
+    :param cur_path: The current path being built, as cell ids.
     :param all_found: A list to store all valid paths found.
-    :param possible_moves_dict: A dictionary containing all possible moves for each coordinate.
-    :param word_set: The set of words to check the paths against.
-    :param prefix_set: A set containing all the possible word prefixes
+    :param cell_coords: A list of the coordinate of each cell id.
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
     """
-    # get word from path
-    word = get_word_from_path(board, cur_path)
-
-    # check that current state of word is even possible
-    if word not in prefix_set:
-        return
-
-    # BASE CASE found valid path with the n length
-    if len(cur_path) == n and word in word_set:
-        all_found.append(cur_path[:])
+    # BASE CASE path reached the n length, longer paths can't be of length n
+    if len(cur_path) == n:
+        if trie.is_word(node):
+            all_found.append([cell_coords[step] for step in cur_path])
         return
 
-    # else, check the next available moves recursivly
-    for move in possible_moves_dict[coord]:
-        if move not in available_coords:
-            # if the move's destination is unavailable, continue
+    # else, check the next available moves recursively
+    for move in neighbours[cell]:
+        if visited[move]:
+            # if the move's destination is already on the path, continue
+            continue
+        # check that the word is still possible with the move's letters
+        next_node = trie.walk(node, cell_letters[move])
+        if next_node is None:
             continue
-        # add move to the path, and remove it from the available destinations list
         cur_path.append(move)
-        available_coords.remove(move)
-        find_length_n_paths_helper(board, n, move, available_coords, cur_path, all_found,
-                                   possible_moves_dict, word_set, prefix_set)
-        # revert the changes - remove move from path, and red-add it to the available destinations list
+        visited[move] = 1
+        find_length_n_paths_helper(n, move, visited, cur_path, all_found,
+                                   cell_coords, cell_letters, neighbours, trie, next_node)
+        visited[move] = 0
         cur_path.pop()
-        available_coords.append(move)
     return
 
 
-def find_length_n_words(n: int, board: Board, words: Iterable[str]) -> List[Path]:
+def find_length_n_words(n: int, board: Board, words: Iterable[str], strategy: Optional[str] = None) -> List[Path]:
     """
     Find all valid paths of length n that form words in the given words list.
     A path is considered valid if:
@@ -147,66 +148,74 @@ def find_length_n_words(n: int, board: Board, words: Iterable[str]) -> List[Path
 
     :param n: The length of the words to find.
     :param board: A 2D list representing the board of the game.
-    :param words: An iterable collection of words to check the paths against.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :param strategy: BOARD_FIRST or WORD_FIRST, picked by plan_search if not given. Both find the same paths,
+                     in the same order (a board with empty cells is always searched board-first).
     :return: A list of valid paths of length n that form words in the given words list.
     """
+    if search_strategy(board, words, strategy) == WORD_FIRST:
+        targets = [word for word in set(words) if len(word) == n]
+        return word_first_paths(board_context(board), targets)
+
     # Init needed data
-    available_coords, possible_moves_dict, words, prefix_set = init_data(board, words)
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
     all_found = list()
+    visited = bytearray(len(cell_coords))
 
-    # calling to the helper function for each and every coord in board
-    for coord in available_coords[:]:
-        # remove the current coord to avoid counting it as a possible move
-        available_coords.remove(coord)
-        find_length_n_words_helper(board, n, coord, available_coords, [coord], all_found,
-                                   possible_moves_dict, words, prefix_set)
-        # return the coord to preserve the data integrity
-        available_coords.append(coord)
+    # calling to the helper function for each and every cell in board
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        find_length_n_words_helper(n, cell, visited, [cell], all_found,
+                                   cell_coords, cell_letters, neighbours, trie, node, len(cell_letters[cell]))
+        visited[cell] = 0
 
     return all_found
 
 
-def find_length_n_words_helper(board, n, coord, available_coords, cur_path, all_found,
-                               possible_moves_dict, word_set, prefix_set):
+def find_length_n_words_helper(n, cell, visited, cur_path, all_found,
+                               cell_coords, cell_letters, neighbours, trie, node, word_len):
     """
     A helper function for find_length_n_words that recursively finds all valid paths of length n
-    that form words in the given words list starting from a given coordinate.
+    that form words in the given words list starting from a given cell.
 
-    :param board: A 2D list representing the board of the game.
     :param n: The length of the words to find.
-    :param coord: The starting coordinate for the path.
-    :param available_coords: A set of coordinates that can be used in the path.
-    :param cur_path: The current path being built.
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path
+                    (updated in place, so a step costs the same on any size of board).
+    :param cur_path: The current path being built, as cell ids.
     :param all_found: A list to store all valid paths found.
-    :param possible_moves_dict: A dictionary containing all possible moves for each coordinate.
-    :param word_set: The set of words to check the paths against.
-    :param prefix_set: A set containing all the possible word prefixes
+    :param cell_coords: A list of the coordinate of each cell id.
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
+    :param word_len: The length of the word formed by the current path.
     """
-    # get word from path
-    word = get_word_from_path(board, cur_path)
-
-    # check that current state of word is even possible
-    if word not in prefix_set:
-        return
-
-    # BASE CASE found valid word in length n
-    if len(word) == n and word in word_set:
-        all_found.append(cur_path[:])
+    # BASE CASE word reached the n length, the word can only get longer from here
+    if word_len >= n:
+        if word_len == n and trie.is_word(node):
+            all_found.append([cell_coords[step] for step in cur_path])
         return
 
     # else, check the next available moves recursively
-    for move in possible_moves_dict[coord]:
-        if move not in available_coords:
-            # if the move's destination is unavailable, continue
+    for move in neighbours[cell]:
+        if visited[move]:
+            # if the move's destination is already on the path, continue
+            continue
+        # check that the word is still possible with the move's letters
+        letters = cell_letters[move]
+        next_node = trie.walk(node, letters)
+        if next_node is None:
             continue
-        # add move to the path, and remove it from the available destinations list
         cur_path.append(move)
-        available_coords.remove(move)
-        find_length_n_words_helper(board, n, move, available_coords, cur_path, all_found,
-                                   possible_moves_dict, word_set, prefix_set)
-        # revert the changes - remove move from path, and red-add it to the available destinations list
+        visited[move] = 1
+        find_length_n_words_helper(n, move, visited, cur_path, all_found,
+                                   cell_coords, cell_letters, neighbours, trie, next_node, word_len + len(letters))
+        visited[move] = 0
         cur_path.pop()
-        available_coords.append(move)
 
     return
 
@@ -221,71 +230,532 @@ def max_score_paths(board: Board, words: Iterable[str]) -> List[Path]:
     4. the word formed by the letters on the path is in the given words.
 
     :param board: A 2D list representing the board of the game.
-    :param words: An iterable collection of words to check the paths against.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
     :return: A list of valid paths on the board with unique words, each with highest scoring
     """
+    best_paths = solve_board(board, words)
+    # longest (highest scoring) paths first, the sort is stable so equal lengths keep the order they were found in
+    return sorted(best_paths.values(), key=len, reverse=True)
+
+
+def solve_board(board: Board, words: Iterable[str]) -> Dict[str, Path]:
+    """
+    Find every word of the given words that is on the board, in a single traversal of the board.
+    Each word is matched with its highest scoring path, which is its longest path
+    (the first one found, if there are several of the same length).
+
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :return: A dictionary of word: path, ordered by the time each path was found
+    """
     # Init needed data
-    available_coords, possible_moves_dict, words, prefix_set = init_data(board, words)
-    all_found = list()
-    words_found = list()
-    range_of_possible_path_lens = range(16, 0, -1)
-
-    # iterating through each possible path lengths
-    for n in range_of_possible_path_lens:
-        # calling to the helper function for each and every coord in board
-        for coord in available_coords[:]:
-            # remove the current coord to avoid counting it as a possible move
-            available_coords.remove(coord)
-            max_score_helper(board, n, coord, available_coords, [coord], all_found, words_found,
-                             possible_moves_dict, words, prefix_set)
-            # return the coord to preserve the data integrity
-            available_coords.append(coord)
-            
-    return all_found
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
+    best_paths = dict()
+    visited = bytearray(len(cell_coords))
+
+    # calling to the helper function for each and every cell in board
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        solve_board_helper(cell, visited, [cell], best_paths,
+                           cell_coords, cell_letters, neighbours, trie, node)
+        visited[cell] = 0
+
+    return best_paths
+
+
+def solve_board_helper(cell, visited, cur_path, best_paths,
+                       cell_coords, cell_letters, neighbours, trie, node):
+    """
+    A helper function for solve_board that recursively finds all the words on the board
+    starting from a given cell, keeping the longest path for each word.
+
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path
+                    (updated in place, so a step costs the same on any size of board).
+    :param cur_path: The current path being built, as cell ids.
+    :param best_paths: A dictionary to store the best path found so far for each word.
+    :param cell_coords: A list of the coordinate of each cell id.
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
+    """
+    # found a word, keep the path if it scores higher than the one already found
+    if trie.is_word(node):
+        word = "".join(cell_letters[step] for step in cur_path)
+        best_path = best_paths.get(word)
+        if best_path is None or len(best_path) < len(cur_path):
+            # re-insert the word, so the dict stays ordered by the time each kept path was found
+            best_paths.pop(word, None)
+            best_paths[word] = [cell_coords[step] for step in cur_path]
+
+    # check the next available moves recursively
+    for move in neighbours[cell]:
+        if visited[move]:
+            # if the move's destination is already on the path, continue
+            continue
+        # check that the word is still possible with the move's letters
+        next_node = trie.walk(node, cell_letters[move])
+        if next_node is None:
+            continue
+        cur_path.append(move)
+        visited[move] = 1
+        solve_board_helper(move, visited, cur_path, best_paths,
+                           cell_coords, cell_letters, neighbours, trie, next_node)
+        visited[move] = 0
+        cur_path.pop()
+    return
 
 
-def max_score_helper(board, n, coord, available_coords, cur_path, all_found, words_found,
-                     possible_moves_dict, word_set, prefix_set):
+#############################################################
+#                                                           #
+#                     search planning                       #
+#                                                           #
+#############################################################
+
+def plan_search(board: Board, words: Iterable[str]) -> str:
     """
-    A helper function for max_score_paths that recursively finds all valid paths on the board with unique words starting from a given coordinate.
+    Picks the cheaper way to search the board for the given words:
+    BOARD_FIRST builds a trie of the words and walks it from every cell of the board,
+    WORD_FIRST looks for each word on its own, starting only from the cells its first letters are on.
+    For a handful of words, word-first skips building the trie and starting a walk from every cell.
+    A prebuilt WordTrie/WordIndex (the whole dictionary) is always searched board-first.
 
     :param board: A 2D list representing the board of the game.
+    :param words: The words that are searched for on the board.
+    :return: BOARD_FIRST or WORD_FIRST
+    """
+    if not _word_first_words(words) or len(words) > WORD_FIRST_MAX_WORDS:
+        return BOARD_FIRST
+    context = board_context(board)
+    if not all(context.cell_letters):
+        # an empty cell is walked through without a letter, which only the board-first search does
+        return BOARD_FIRST
+    board_cost = BOARD_CELL_COST * len(context.cell_coords)
+    word_cost = 0.0
+    for word in words:
+        board_cost += TRIE_LETTER_COST * len(word)
+        starts = context.cells_by_first_letter.get(word[:1])
+        if starts:
+            # a word whose first two letters aren't next to each other is dropped after a single step
+            steps = len(word) if len(word) == 1 or word[:2] in context.letter_pairs else 1
+            word_cost += WORD_STEP_COST * steps * len(starts)
+    return WORD_FIRST if word_cost < board_cost else BOARD_FIRST
+
+
+def search_strategy(board: Board, words: Iterable[str], strategy: Optional[str] = None) -> str:
+    """
+    :param board: A 2D list representing the board of the game.
+    :param words: The words that are searched for on the board.
+    :param strategy: BOARD_FIRST, WORD_FIRST, or None to let plan_search pick one.
+    :return: The strategy to search the board with. WORD_FIRST falls back to BOARD_FIRST on a board with
+             empty cells, which only the board-first search walks through, and for a prebuilt WordTrie/WordIndex
+             or words that aren't a collection, which the word-first search can't list.
+    :raises ValueError: If the strategy is neither of the two.
+    """
+    if strategy is None:
+        return plan_search(board, words)
+    if strategy not in (BOARD_FIRST, WORD_FIRST):
+        raise ValueError(f"unknown search strategy {strategy!r}, expected {BOARD_FIRST!r} or {WORD_FIRST!r}")
+    if strategy == WORD_FIRST and (not _word_first_words(words) or not all(board_context(board).cell_letters)):
+        return BOARD_FIRST
+    return strategy
+
+
+def _word_first_words(words: Iterable[str]) -> bool:
+    """
+    :return: Whether the words can be searched word-first: a collection that lists its words,
+             and not a prebuilt WordTrie/WordIndex (the whole dictionary)
+    """
+    return isinstance(words, Collection) and not isinstance(words, (WordTrie, WordIndex))
+
+
+def present_words(board: Board, words: Iterable[str]) -> Dict[str, Path]:
+    """
+    Finds which of the given words are on the board.
+    A word-first search stops looking for a word at its first path, so for a few words
+    this is much faster than solving the board.
+
+    :param board: A 2D list representing the board of the game.
+    :param words: The words to look for (a list, set, or a prebuilt WordTrie/WordIndex).
+    :return: A dictionary of word: a valid path of the word, for every word that is on the board
+    """
+    if plan_search(board, words) == BOARD_FIRST:
+        return solve_board(board, words)
+    context = board_context(board)
+    found = dict()
+    for word in dict.fromkeys(words):
+        paths = word_first_paths(context, [word], first_only=True)
+        if paths:
+            found[word] = paths[0]
+    return found
+
+
+def word_first_paths(context: "BoardContext", targets: Iterable[str], n_cells: Optional[int] = None,
+                     first_only: bool = False) -> List[Path]:
+    """
+    Finds the paths of the target words, a word at a time, from the cells its first letters are on.
+    The paths are returned in the order a board-first search finds them (their cell ids in ascending order).
+
+    :param context: The BoardContext of the board (its cells mustn't be empty).
+    :param targets: The words to find, each at most once.
+    :param n_cells: If given, only paths of this many cells are found.
+    :param first_only: Stop looking for each word at its first path.
+    :return: A list of the paths of all the target words.
+    """
+    found = list()
+    visited = bytearray(len(context.cell_coords))
+    for word in targets:
+        for cell in context.cells_by_first_letter.get(word[:1], ()):
+            letters = context.cell_letters[cell]
+            if not word.startswith(letters):
+                continue
+            visited[cell] = 1
+            done = word_first_helper(word, len(letters), cell, visited, [cell], found, n_cells, first_only,
+                                     context.cell_letters, context.neighbours)
+            visited[cell] = 0
+            if done:
+                break
+    found.sort()
+    return [[context.cell_coords[step] for step in path] for path in found]
+
+
+def word_first_helper(word, matched, cell, visited, cur_path, found, n_cells, first_only,
+                      cell_letters, neighbours) -> bool:
+    """
+    A helper function for word_first_paths that recursively follows a single word from a given cell.
+
+    :param word: The word being followed.
+    :param matched: The number of letters of the word on the current path.
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path (updated in place).
+    :param cur_path: The current path being built, as cell ids.
+    :param found: A list to store the found paths (as lists of cell ids).
+    :param n_cells: If not None, only paths of this many cells are kept.
+    :param first_only: Whether to stop at the first path of the word.
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :return: True when the search of this word should stop
+    """
+    # BASE CASE the path spells the whole word, every cell has letters so it can't go on
+    if matched == len(word):
+        if n_cells is None or len(cur_path) == n_cells:
+            found.append(cur_path[:])
+            return first_only
+        return False
+    if n_cells is not None and len(cur_path) >= n_cells:
+        return False
+
+    for move in neighbours[cell]:
+        if visited[move]:
+            continue
+        letters = cell_letters[move]
+        if not word.startswith(letters, matched):
+            continue
+        cur_path.append(move)
+        visited[move] = 1
+        done = word_first_helper(word, matched + len(letters), move, visited, cur_path, found, n_cells, first_only,
+                                 cell_letters, neighbours)
+        visited[move] = 0
+        cur_path.pop()
+        if done:
+            return True
+    return False
+
+
+#############################################################
+#                                                           #
+#                        streaming                          #
+#                                                           #
+#############################################################
+
+def iter_length_n_paths(n: int, board: Board, words: Iterable[str], limit: Optional[int] = None) -> Iterator[Path]:
+    """
+    A lazy find_length_n_paths: yields the same paths in the same order, each as soon as the search finds it.
+    The search only holds the current path, and stops once limit paths were yielded,
+    or when the caller closes the generator (or drops it).
+
     :param n: The length of the paths to find.
-    :param coord: The starting coordinate for the path.
-    :param available_coords: A set of coordinates that can be used in the path.
-    :param cur_path: The current path being built.
-    :param all_found: A list to store all valid paths found.
-    :param words_found: A list of unique words that have been found so far.
-    :param possible_moves_dict: A dictionary containing all possible moves for each coordinate.
-    :param word_set: The set of words to check the paths against.
-    :param prefix_set: A set containing all the possible word prefixes
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :param limit: The largest number of paths to yield (None for all of them).
+    :return: An iterator of valid paths of length n on the board.
+    """
+    found = _iter_board_paths(board, words, max_cells=n, max_letters=None)
+    yield from islice((path for cells, word_len, path in found if len(cells) == n), limit)
+
+
+def iter_length_n_words(n: int, board: Board, words: Iterable[str], limit: Optional[int] = None) -> Iterator[Path]:
+    """
+    A lazy find_length_n_words: yields the same paths in the same order, each as soon as the search finds it
+    (see iter_length_n_paths).
+
+    :param n: The length of the words to find.
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :param limit: The largest number of paths to yield (None for all of them).
+    :return: An iterator of valid paths of length n that form words in the given words list.
+    """
+    found = _iter_board_paths(board, words, max_cells=None, max_letters=n)
+    yield from islice((path for cells, word_len, path in found if word_len == n), limit)
+
+
+def iter_word_paths(board: Board, words: Iterable[str], limit: Optional[int] = None) -> Iterator[Tuple[str, Path]]:
     """
-    # get word from path
-    word = get_word_from_path(board, cur_path)
+    A lazy max_score_paths: yields every word on the board once, with the first path the search finds for it.
+    That path isn't necessarily the word's highest scoring one, which is only known after a full search
+    (use solve_board for it). Besides the current path, the search only holds the set of the words yielded.
 
-    # check that current state of word is even possible
-    if word not in prefix_set:
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :param limit: The largest number of words to yield (None for all of them).
+    :return: An iterator of (word, path) tuples, in the order the words were found.
+    """
+    if limit == 0:
         return
+    cell_letters = board_context(board).cell_letters
+    seen = set()
+    for cells, word_len, path in _iter_board_paths(board, words, max_cells=None, max_letters=None):
+        word = "".join(cell_letters[cell] for cell in cells)
+        if word not in seen:
+            seen.add(word)
+            yield word, path
+            if len(seen) == limit:
+                return
+
+
+def _iter_board_paths(board: Board, words: Iterable[str], max_cells: Optional[int],
+                      max_letters: Optional[int]) -> Iterator[Tuple[List[int], int, Path]]:
+    """
+    Searches the board like find_length_n_paths does, without recursion, and yields every path that forms
+    a word as soon as it's found. A path isn't extended once it has max_cells cells or max_letters letters.
+
+    :return: An iterator of tuples of the path's cell ids (the live current path, don't keep it),
+             its number of letters, and the path
+    """
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
+    visited = bytearray(len(cell_coords))
+    cur_path = list()
+    # for every cell on the current path: the trie node its letters reached, the number of letters
+    # up to it, and an iterator of its neighbours that weren't tried yet
+    nodes, word_lens, moves = list(), list(), list()
+
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        step, word_len = cell, len(cell_letters[cell])
+        while True:
+            if step is not None:
+                # the path was extended by step, report it if it forms a word and see if it can go on
+                cur_path.append(step)
+                visited[step] = 1
+                if trie.is_word(node):
+                    yield cur_path, word_len, [cell_coords[c] for c in cur_path]
+                if (max_cells is None or len(cur_path) < max_cells) and \
+                        (max_letters is None or word_len < max_letters):
+                    nodes.append(node)
+                    word_lens.append(word_len)
+                    moves.append(iter(neighbours[step]))
+                else:
+                    visited[cur_path.pop()] = 0
+            if not moves:
+                break
+            # try the next neighbour of the last cell, or step back from it when there are none left
+            step = None
+            for move in moves[-1]:
+                if visited[move]:
+                    continue
+                next_node = trie.walk(nodes[-1], cell_letters[move])
+                if next_node is not None:
+                    step, node, word_len = move, next_node, word_lens[-1] + len(cell_letters[move])
+                    break
+            if step is None:
+                moves.pop()
+                nodes.pop()
+                word_lens.pop()
+                visited[cur_path.pop()] = 0
 
-    # BASE CASE found valid word, with the highest score, and with the right path length
-    if len(cur_path) == n and word in word_set and word not in words_found:
-        all_found.append(cur_path[:])
-        return words_found.append(word)
 
-    # else, check the next available moves recursively
-    for move in possible_moves_dict[coord]:
-        if move not in available_coords:
-            # if the move's destination is unavailable, continue
+#############################################################
+#                                                           #
+#                        counting                           #
+#                                                           #
+#############################################################
+
+def count_length_n_paths(n: int, board: Board, words: Iterable[str]) -> int:
+    """
+    Counts the paths find_length_n_paths finds, without building any of them.
+
+    :param n: The length of the paths to count.
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :return: The number of valid paths of length n on the board.
+    """
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
+    visited = bytearray(len(cell_coords))
+    total = 0
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        total += count_paths_helper(n, 1, cell, visited, cell_letters, neighbours, trie, node)
+        visited[cell] = 0
+    return total
+
+
+def count_paths_helper(n, depth, cell, visited, cell_letters, neighbours, trie, node) -> int:
+    """
+    A helper function for count_length_n_paths that recursively counts the valid paths of length n
+    that continue the current path.
+
+    :param n: The length of the paths to count.
+    :param depth: The number of cells on the current path.
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path (updated in place).
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
+    :return: The number of the paths found
+    """
+    if depth == n:
+        return 1 if trie.is_word(node) else 0
+    total = 0
+    for move in neighbours[cell]:
+        if visited[move]:
+            continue
+        next_node = trie.walk(node, cell_letters[move])
+        if next_node is None:
+            continue
+        visited[move] = 1
+        total += count_paths_helper(n, depth + 1, move, visited, cell_letters, neighbours, trie, next_node)
+        visited[move] = 0
+    return total
+
+
+def count_length_n_words(n: int, board: Board, words: Iterable[str]) -> int:
+    """
+    Counts the paths find_length_n_words finds, without building any of them.
+
+    :param n: The length of the words to count.
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :return: The number of valid paths of length n that form words in the given words list.
+    """
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
+    visited = bytearray(len(cell_coords))
+    total = 0
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        total += count_words_helper(n, len(cell_letters[cell]), cell, visited, cell_letters, neighbours, trie, node)
+        visited[cell] = 0
+    return total
+
+
+def count_words_helper(n, word_len, cell, visited, cell_letters, neighbours, trie, node) -> int:
+    """
+    A helper function for count_length_n_words that recursively counts the valid paths that continue
+    the current path and form words of length n.
+
+    :param n: The length of the words to count.
+    :param word_len: The length of the word formed by the current path.
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path (updated in place).
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
+    :return: The number of the paths found
+    """
+    if word_len >= n:
+        return 1 if word_len == n and trie.is_word(node) else 0
+    total = 0
+    for move in neighbours[cell]:
+        if visited[move]:
+            continue
+        letters = cell_letters[move]
+        next_node = trie.walk(node, letters)
+        if next_node is None:
+            continue
+        visited[move] = 1
+        total += count_words_helper(n, word_len + len(letters), move, visited, cell_letters, neighbours, trie,
+                                    next_node)
+        visited[move] = 0
+    return total
+
+
+def board_histogram(board: Board, words: Iterable[str], score_pow: int) -> Dict[str, object]:
+    """
+    Counts what a full solve of the board finds, in a single traversal, without building any path:
+    the number of paths of each length (in cells) that form words, the number of distinct words
+    of each length (in letters), and the board's max score (every word scored by its longest path).
+
+    :param board: A 2D list representing the board of the game.
+    :param words: An iterable collection of words (or a prebuilt WordTrie/WordIndex) to check the paths against.
+    :param score_pow: The power of a path's length that is its score (as in the game).
+    :return: A dictionary of "paths": {cells: count}, "words": {letters: count} and "score": max score
+    """
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
+    visited = bytearray(len(cell_coords))
+    path_counts = [0] * (len(cell_coords) + 1)
+    best_lengths = dict()  # of WORD: NUMBER OF CELLS OF ITS LONGEST PATH
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        board_histogram_helper(cell, visited, [cell], path_counts, best_lengths, cell_letters, neighbours, trie, node)
+        visited[cell] = 0
+
+    word_counts = dict()
+    for word in best_lengths:
+        word_counts[len(word)] = word_counts.get(len(word), 0) + 1
+    return {"paths": {cells: count for cells, count in enumerate(path_counts) if count},
+            "words": dict(sorted(word_counts.items())),
+            "score": sum(cells ** score_pow for cells in best_lengths.values())}
+
+
+def board_histogram_helper(cell, visited, cur_path, path_counts, best_lengths, cell_letters, neighbours, trie, node):
+    """
+    A helper function for board_histogram that recursively counts the words on the board
+    starting from a given cell.
+
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path (updated in place).
+    :param cur_path: The current path being built, as cell ids (the only path that is kept).
+    :param path_counts: A list of the number of word paths found of each number of cells.
+    :param best_lengths: A dictionary of the number of cells of the longest path found for each word.
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
+    """
+    if trie.is_word(node):
+        path_counts[len(cur_path)] += 1
+        word = "".join(cell_letters[step] for step in cur_path)
+        if best_lengths.get(word, 0) < len(cur_path):
+            best_lengths[word] = len(cur_path)
+
+    for move in neighbours[cell]:
+        if visited[move]:
+            continue
+        next_node = trie.walk(node, cell_letters[move])
+        if next_node is None:
             continue
-        # add move to the path, and remove it from the available destinations list
         cur_path.append(move)
-        available_coords.remove(move)
-        max_score_helper(board, n, move, available_coords, cur_path, all_found, words_found,
-                         possible_moves_dict, word_set, prefix_set)
-        # revert the changes - remove move from path, and re-add it to the available destinations list
+        visited[move] = 1
+        board_histogram_helper(move, visited, cur_path, path_counts, best_lengths, cell_letters, neighbours, trie,
+                               next_node)
+        visited[move] = 0
         cur_path.pop()
-        available_coords.append(move)
-    return
 
 
 #############################################################
@@ -294,24 +764,119 @@ def max_score_helper(board, n, coord, available_coords, cur_path, all_found, wor
 #                                                           #
 #############################################################
 
-def init_data(board: Board, words: Iterable[str]) -> Tuple[List[Tuple[int, int]],
-                                                           Dict[Tuple[int, int], List[Tuple[int, int]]], set, set]:
+def init_data(board: Board, words: Iterable[str]) -> Tuple[List[Tuple[int, int]], List[str], List[Tuple[int, ...]],
+                                                           Union[WordTrie, WordIndex]]:
     """
-    Initializes and returns data required for the game of Boggle.
+    Initializes and returns data required for searching the board.
+    Every cell of the board gets an integer id (its row-major index), and the search works on these ids.
     The function returns a tuple containing the following elements:
-    1. available_coords: a list of all coordinates of cells on the Boggle board represented as tuple (x, y).
-    2. possible_moves_dict: a dictionary of all possible next moves for each coordinate on the board.
-    3. words: a set of all words to be searched for on the board
-    4. words_prefix: a set of all prefixes of words in the words set
+    1. cell_coords: a list of the coordinate (x, y) of each cell id.
+    2. cell_letters: a list of the letters of each cell id. A cell of several letters (e.g. 'QU') is followed
+       down the trie in a single walk step, without joining any strings.
+    3. neighbours: a list of the neighbouring cell ids of each cell id.
+    4. trie: a WordTrie (or WordIndex) of all words to be searched for on the board
 
     :param board: 2D list representing the Boggle board
-    :param words: Iterable set of words to be searched for on the board
-    :return: Tuple of data required for the game of Boggle
+    :param words: Iterable set of words to be searched for on the board, an already built WordTrie/WordIndex,
+                  or a collection with a possible_words(board) method (like letter_signatures.LetterSignatures),
+                  whose trie only gets the words that method allows
+    :return: Tuple of data required for searching the board
+    """
+    context = board_context(board)
+    # duck typed, so plain collections of words never load NumPy for the signatures
+    prune = getattr(words, "possible_words", None)
+    if prune is not None:
+        words = prune(board)
+    if isinstance(words, (WordTrie, WordIndex)):
+        trie = words
+    else:
+        # a trie built here is used for a single search, so it only gets the words spelled with the board's
+        # letters, and doesn't spend time compacting them
+        board_letters = context.letter_set
+        trie = WordTrie((word for word in words if board_letters.issuperset(word)), compact=False)
+    return context.cell_coords, context.cell_letters, context.neighbours, trie
+
+
+class BoardContext:
     """
-    available_coords, possible_moves_dict = init_partial_data(board)
-    words = set(words)
-    words_prefix = words_prefix_set(words)
-    return available_coords, possible_moves_dict, words, words_prefix
+    The data of a board that doesn't depend on the words: the id, letters and neighbours of every cell.
+    It's built once per board (see board_context), and then validates paths on the board in O(path length).
+    """
+
+    def __init__(self, board: Board):
+        """
+        :param board: 2D list representing the Boggle board
+        """
+        self.cell_coords = tuple(board_coordinates(board))
+        self.cell_letters = tuple(board[x][y] for x, y in self.cell_coords)
+        self.neighbours = tuple(neighbours_table(self.cell_coords))
+        self.cell_ids = {coord: cell for cell, coord in enumerate(self.cell_coords)}
+        self.neighbour_sets = tuple(frozenset(moves) for moves in self.neighbours)
+        # every letter on the board, a word with any other letter can't be on it
+        self.letter_set = frozenset("".join(self.cell_letters))
+        # the ids of the cells of each first letter, where a word-first search starts
+        self.cells_by_first_letter = dict()
+        for cell, letters in enumerate(self.cell_letters):
+            self.cells_by_first_letter.setdefault(letters[:1], list()).append(cell)
+        # the first two letters of every path of two cells, to estimate how far a word gets on the board
+        self.letter_pairs = frozenset((self.cell_letters[cell] + self.cell_letters[move])[:2]
+                                      for cell, moves in enumerate(self.neighbours) for move in moves)
+
+    def word_on_path(self, path: Path, words: Iterable[str]) -> Optional[str]:
+        """
+        Checks if a given path on the board is valid, as is_valid_path does.
+        With a WordTrie or WordIndex, the letters of every cell (however many) are followed in a single step.
+
+        :param path: A list of coordinates (tuples) representing a path on the board.
+        :param words: A collection of words (a set, WordTrie or WordIndex) to check the path against.
+        :return: The valid word on the path if the path is valid, None otherwise.
+        """
+        # a trie is walked a cell at a time while the path is checked, so a path that leaves the words
+        # stops there, and the word's string is only built once the path is known to be valid
+        trie = words if isinstance(words, (WordTrie, WordIndex)) else None
+        node = trie.root if trie is not None else None
+        visited = set()
+        prev_cell = None
+        for step in path:
+            cell = self.cell_ids.get(step)
+            # the coordinate is not on the board, or the cell is already on the path
+            if cell is None or cell in visited:
+                return None
+            # the move from the previous cell is not valid
+            if prev_cell is not None and cell not in self.neighbour_sets[prev_cell]:
+                return None
+            if trie is not None:
+                node = trie.walk(node, self.cell_letters[cell])
+                if node is None:
+                    return None
+            visited.add(cell)
+            prev_cell = cell
+
+        if trie is not None and not trie.is_word(node):
+            return None
+        word = "".join(self.cell_letters[self.cell_ids[step]] for step in path)
+        if trie is None and word not in words:
+            return None
+        return word
+
+
+def board_context(board: Board) -> BoardContext:
+    """
+    Returns the BoardContext of the board, from a cache of the recently used boards.
+    The cache is keyed by the board's content, so a board that was changed in place gets a new context.
+
+    :param board: 2D list representing the Boggle board
+    :return: The BoardContext of the board
+    """
+    return _cached_board_context(tuple(map(tuple, board)))
+
+
+@lru_cache(maxsize=BOARD_CONTEXT_CACHE_SIZE)
+def _cached_board_context(board_key: Tuple[Tuple[str, ...], ...]) -> BoardContext:
+    """
+    Builds the BoardContext of a board given as a tuple of row tuples (so it can be a cache key).
+    """
+    return BoardContext(board_key)
 
 
 def init_partial_data(board: Board):
@@ -349,6 +914,7 @@ def possible_moves(coordinates_list: List[Tuple[int, int]]) -> Dict[Tuple[int, i
     """
     # init needed data
     possible_dict = dict()
+    coordinates_set = set(coordinates_list)
     left_step = -1
     right_step = 2
 
@@ -361,13 +927,39 @@ def possible_moves(coordinates_list: List[Tuple[int, int]]) -> Dict[Tuple[int, i
             for col_delta in range(left_step, right_step):
                 res_cell = (coord[0] + row_delta, coord[1] + col_delta)
                 # ignore coordinates that aren't in coords_set or equal to checked cell
-                if res_cell in coordinates_list and res_cell != coord:
+                if res_cell in coordinates_set and res_cell != coord:
                     # insert into the with coord as key and all possible move in a list as value
                     possible_dict[coord].append(res_cell)
 
     return possible_dict
 
 
+def neighbours_table(cell_coords: List[Tuple[int, int]]) -> List[Tuple[int, ...]]:
+    """
+    Returns the neighbouring cell ids of each cell id, based on the possible moves between the coordinates.
+
+    :param cell_coords: A list of the coordinate of each cell id.
+    :return: A list where index i holds a tuple of the ids of the cells that can be reached from cell i
+    """
+    cell_ids = {coord: cell for cell, coord in enumerate(cell_coords)}
+    possible_moves_dict = possible_moves(cell_coords)
+    return [tuple(cell_ids[move] for move in possible_moves_dict[coord]) for coord in cell_coords]
+
+
+def first_step(letters: str, trie: Union[WordTrie, WordIndex]):
+    """
+    Returns the trie node reached by the letters of a single cell, to start a path from it.
+
+    :param letters: The letters of the first cell of the path
+    :param trie: The WordTrie (or WordIndex) of the words that are searched for on the board
+    :return: The trie node, or None if no word starts with the cell's letters
+    """
+    # an empty cell would leave us at the root, and the empty word is not a prefix of any word
+    if not letters:
+        return None
+    return trie.walk(trie.root, letters)
+
+
 def words_prefix_set(words_set: Iterable[str]) -> set:
     """
     Returns a set of all prefixes of words in the input set.
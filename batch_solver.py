@@ -0,0 +1,249 @@
+from typing import Iterable, Iterator, List, Dict, Any, BinaryIO, TextIO, Optional, Callable
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+import argparse
+import json
+import os
+import struct
+import sys
+
+from algos import Board, Path, solve_board
+from boggle_model import SCORE_POW_MULTIPLIER
+from solution_cache import SolutionCache
+from word_index import WordIndex, load_word_index, WORDS_PATH, INDEX_PATH
+
+DEFAULT_CHUNKSIZE = 64
+PENDING_CHUNKS_PER_PROCESS = 2
+# a binary board record is ROWS, COLS (one byte each), then every cell as LENGTH (one byte) and its utf-8 letters
+RECORD_HEADER = struct.Struct('=BB')
+CELL_HEADER = struct.Struct('=B')
+
+# the words index of a worker process, loaded once by init_worker
+_worker_index: Optional[WordIndex] = None
+# the solutions of the boards a worker process already solved, if the run caches them (see init_worker)
+_worker_cache: Optional[SolutionCache] = None
+
+
+#############################################################
+#                                                           #
+#                         solving                           #
+#                                                           #
+#############################################################
+
+def solve_boards(boards: Iterable[Board], processes: Optional[int] = None, words_path: str = WORDS_PATH,
+                 index_path: str = INDEX_PATH, chunksize: int = DEFAULT_CHUNKSIZE,
+                 solver: Optional[Callable[[Board], Any]] = None, cache_size: Optional[int] = None) -> Iterator[Any]:
+    """
+    Solves a stream of boards on a pool of worker processes, each of which maps the words index once.
+    The boards are consumed lazily, only a few chunks ahead of the results, and the results are yielded
+    in the order of the boards.
+
+    :param boards: An iterable of boards (2D lists of strings)
+    :param processes: The number of worker processes (defaults to the number of cores), 1 solves in this process
+    :param words_path: The path of the words file
+    :param index_path: The path of the compiled words index (compiled first if it's missing or stale)
+    :param chunksize: The number of boards sent to a worker at a time
+    :param solver: A module level function that solves a single board with worker_index() (defaults to solve_one)
+    :param cache_size: If given, every worker caches the solutions of up to this many boards (see init_worker)
+    :return: An iterator of the results of the solver, one per board
+    """
+    solver = solver or solve_one
+    # make sure the index is compiled before the workers try to map it
+    load_word_index(words_path, index_path)
+    if processes == 1:
+        init_worker(index_path, cache_size)
+        yield from map(solver, boards)
+        return
+    # Pool.imap would read the whole input ahead, so keep a bounded window of chunks in flight instead
+    max_pending = PENDING_CHUNKS_PER_PROCESS * (processes or os.cpu_count() or 1)
+    pending = deque()
+    with Pool(processes, initializer=init_worker, initargs=(index_path, cache_size)) as pool:
+        for chunk in _chunks(boards, chunksize):
+            pending.append(pool.apply_async(_solve_chunk, (solver, chunk)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Splits an iterable into lists of the given size (the last one may be smaller).
+    """
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _solve_chunk(solver: Callable[[Board], Any], boards: List[Board]) -> List[Any]:
+    """
+    Solves a chunk of boards in a worker process.
+    """
+    return [solver(board) for board in boards]
+
+
+def init_worker(index_path: str, cache_size: Optional[int] = None) -> None:
+    """
+    Maps the words index in a worker process.
+    :param index_path: The path of the compiled words index
+    :param cache_size: If given, the worker caches the solutions of up to this many boards. It only pays off
+    for inputs that repeat boards (up to rotations and reflections), like puzzle archives, so it's off by default
+    """
+    global _worker_index, _worker_cache
+    _worker_index = WordIndex(index_path)
+    _worker_cache = SolutionCache(_worker_index, cache_size) if cache_size else None
+
+
+def worker_index() -> WordIndex:
+    """
+    :return: The words index mapped by the current worker process
+    """
+    return _worker_index
+
+
+def worker_cache() -> Optional[SolutionCache]:
+    """
+    :return: The solution cache of the current worker process, None if it doesn't cache solutions
+    """
+    return _worker_cache
+
+
+def solve_one(board: Board) -> Dict[str, Any]:
+    """
+    Solves a single board with the words index of the current worker, through the worker's solution cache if any.
+
+    :param board: A 2D list representing the board of the game
+    :return: A dictionary with the board, the highest scoring path of every word on it, and the board's max score
+    """
+    cache = worker_cache()
+    best_paths = solve_board(board, worker_index()) if cache is None else cache.solve_board(board)
+    return {"board": board, "words": best_paths, "score": paths_score(best_paths.values())}
+
+
+def paths_score(paths: Iterable[Path]) -> int:
+    """
+    :param paths: Paths of found words
+    :return: The total score of the paths, as scored in the game
+    """
+    return sum(len(path) ** SCORE_POW_MULTIPLIER for path in paths)
+
+
+#############################################################
+#                                                           #
+#                      boards streams                       #
+#                                                           #
+#############################################################
+
+def read_json_boards(f: TextIO) -> Iterator[Board]:
+    """
+    Reads boards from a JSON lines stream, one board (a list of rows) per line. Blank lines are skipped.
+    """
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_binary_boards(f: BinaryIO) -> Iterator[Board]:
+    """
+    Reads boards from a stream of binary board records (see RECORD_HEADER).
+    :raises ValueError: If the stream ends in the middle of a record
+    """
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if not header:
+            return
+        rows, cols = RECORD_HEADER.unpack(_complete(header, f, RECORD_HEADER.size))
+        board = list()
+        for _ in range(rows):
+            row = list()
+            for _ in range(cols):
+                length, = CELL_HEADER.unpack(_read_exactly(f, CELL_HEADER.size))
+                row.append(_read_exactly(f, length).decode())
+            board.append(row)
+        yield board
+
+
+def _read_exactly(f: BinaryIO, size: int) -> bytes:
+    """
+    :return: The next size bytes of the stream
+    :raises ValueError: If the stream ends before them
+    """
+    return _complete(f.read(size), f, size)
+
+
+def _complete(data: bytes, f: BinaryIO, size: int) -> bytes:
+    """
+    Reads the rest of a short read (a pipe may return fewer bytes than asked for before its end).
+    :return: The given data, with the rest of its size bytes read from the stream
+    :raises ValueError: If the stream ends before them
+    """
+    while len(data) < size:
+        more = f.read(size - len(data))
+        if not more:
+            raise ValueError(f"truncated binary board record: expected {size} bytes, got {len(data)}")
+        data += more
+    return data
+
+
+def write_binary_boards(boards: Iterable[Board], f: BinaryIO) -> None:
+    """
+    Writes boards as binary board records (see RECORD_HEADER).
+    :raises ValueError: If a board isn't rectangular, has more than 255 rows or columns,
+    or has a cell of more than 255 bytes
+    """
+    limit = (1 << (8 * CELL_HEADER.size)) - 1
+    for board in boards:
+        rows, cols = len(board), len(board[0]) if board else 0
+        if any(len(row) != cols for row in board):
+            raise ValueError("only a rectangular board can be written as a binary record")
+        if rows > limit or cols > limit:
+            raise ValueError(f"a binary board record has at most {limit} rows and columns")
+        encoded_cells = [letters.encode() for row in board for letters in row]
+        if any(len(encoded) > limit for encoded in encoded_cells):
+            raise ValueError(f"a binary board record cell has at most {limit} bytes")
+        f.write(RECORD_HEADER.pack(rows, cols))
+        for encoded in encoded_cells:
+            f.write(CELL_HEADER.pack(len(encoded)))
+            f.write(encoded)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line entry point: solves a stream of boards and writes a JSON line per board, in input order.
+    """
+    parser = argparse.ArgumentParser(description="Solve a stream of Boggle boards on all cores.")
+    parser.add_argument("input", nargs="?", default="-", help="boards file, '-' for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="results file, '-' for stdout (default)")
+    parser.add_argument("-f", "--format", choices=("json", "binary"), default="json", help="format of the boards")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="boards sent to a worker at a time")
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="cache the solutions of up to this many boards per worker (for inputs with repeats)")
+    parser.add_argument("--words", default=WORDS_PATH, help="words file")
+    parser.add_argument("--index", default=INDEX_PATH, help="compiled words index")
+    args = parser.parse_args(argv)
+
+    if args.format == "json":
+        source = sys.stdin if args.input == "-" else open(args.input, 'r')
+        boards = read_json_boards(source)
+    else:
+        source = sys.stdin.buffer if args.input == "-" else open(args.input, 'rb')
+        boards = read_binary_boards(source)
+    target = sys.stdout if args.output == "-" else open(args.output, 'w')
+
+    try:
+        for result in solve_boards(boards, args.processes, args.words, args.index, args.chunksize,
+                                   cache_size=args.cache_size):
+            target.write(json.dumps(result) + "\n")
+    finally:
+        if source not in (sys.stdin, sys.stdin.buffer):
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from itertools import cycle
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from algos import Board, is_valid_path, find_length_n_paths, find_length_n_words, max_score_paths, \
+    solve_board, words_prefix_set, present_words, iter_length_n_paths, count_length_n_paths, board_histogram, \
+    BOARD_FIRST, WORD_FIRST
+from boggle_board_randomizer import randomize_board, dice_for_size, LETTERS, DICE_SETS, BOARD_SIZE
+from boggle_model import BoggleBoard, generate_words_set_from_file
+from letter_signatures import LetterSignatures
+from solution_cache import SolutionCache, SYMMETRIES, transform_board
+from word_index import WordIndex, load_word_index
+from word_trie import WordTrie
+
+BENCH_SEED = 2023
+RANDOM_BOARDS = 20
+# (rows, cols) of the large grids, the solver's time per cell should stay flat as they grow
+LARGE_GRID_SIZES = ((8, 8), (16, 16), (32, 32), (64, 64), (16, 64))
+REGRESSION_THRESHOLD = 1.25
+
+# boards from test_set_1 that stress multi-letter cells and nested words
+PATHOLOGICAL_BOARDS = {
+    "multi_letter_cells": [["r", "e", "k"],
+                           ["g", "d", "e"],
+                           ["n", "pok", "li"]],
+    "quick_quickly": [["QU", "CK", "?", "?"],
+                      ["?", "I", "?", "Y"],
+                      ["CK", "C", "K", "L"],
+                      ["LY", "?", "?", "?"]],
+    "non_qu_cells": [["P", "LL", "W", "L"],
+                     ["I", "K", "T", "R"],
+                     ["E", "N", "PE", "D"],
+                     ["A", "M", "L", "C"]],
+    "dense_vowels": [["I", "E", "E", "Y"],
+                     ["E", "B", "I", "W"],
+                     ["A", "V", "E", "R"],
+                     ["U", "W", "A", "P"]],
+}
+
+
+#############################################################
+#                                                           #
+#                        measuring                          #
+#                                                           #
+#############################################################
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Calls the function repeat times and measures its latency, then calls it once more under tracemalloc
+    to measure its peak memory (tracing slows the calls down, so it's kept out of the timings).
+
+    :param func: A function with no arguments
+    :param repeat: The number of timed calls
+    :return: A dictionary of the latency percentiles and mean (in milliseconds), throughput (calls per second)
+    and peak memory (in KiB)
+    """
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(timings)
+    return {"calls": repeat,
+            "p50_ms": percentile(timings, 50) * 1000,
+            "p90_ms": percentile(timings, 90) * 1000,
+            "p99_ms": percentile(timings, 99) * 1000,
+            "mean_ms": total / repeat * 1000,
+            "throughput_per_s": repeat / total if total else float("inf"),
+            "peak_mem_kib": peak / 1024}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    :return: The nearest-rank percentile of an already sorted list
+    """
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def cycling(func: Callable[[Any], Any], inputs: List[Any]) -> Callable[[], Any]:
+    """
+    :return: A function with no arguments that calls func on the next input (e.g. board) of the inputs,
+    round robin, so every timed call is a single input
+    """
+    inputs_cycle = cycle(inputs)
+    return lambda: func(next(inputs_cycle))
+
+
+#############################################################
+#                                                           #
+#                         boards                            #
+#                                                           #
+#############################################################
+
+def seeded_boards(count: int, seed: int = BENCH_SEED, rows: int = BOARD_SIZE, cols: Optional[int] = None) -> List[Board]:
+    """
+    :return: A fixed list of boards from randomize_board, rolled from the dice set of their size
+    """
+    cols = rows if cols is None else cols
+    random.seed(seed)
+    dice_list = dice_for_size(rows, cols)
+    return [randomize_board(dice_list, rows, cols) for _ in range(count)]
+
+
+def large_grid(rows: int, cols: Optional[int] = None, seed: int = BENCH_SEED) -> Board:
+    """
+    :return: A rows x cols board (square by default), every cell showing a random face of a random die
+    """
+    cols = rows if cols is None else cols
+    rng = random.Random(seed + rows * cols)
+    return [[rng.choice(rng.choice(LETTERS)) for _ in range(cols)] for _ in range(rows)]
+
+
+def hosted_games(count: int) -> List[BoggleBoard]:
+    """
+    :return: A list of count started games, as a server hosting them would keep them
+    """
+    games = [BoggleBoard() for _ in range(count)]
+    for game in games:
+        game.reset_board()
+    return games
+
+
+#############################################################
+#                                                           #
+#                        the suite                          #
+#                                                           #
+#############################################################
+
+def benchmark_cases(quick: bool) -> List[Tuple[str, Callable[[], Any], int]]:
+    """
+    Builds the benchmark cases. Each case is a tuple of NAME, FUNCTION (no arguments), REPEAT.
+
+    :param quick: Whether to cut the repeats down, for a fast sanity run
+    """
+    scale = 1 if quick else 5
+    words = generate_words_set_from_file()
+    index = load_word_index()
+    trie = WordTrie(words)
+    signatures = LetterSignatures(words)
+    boards = seeded_boards(RANDOM_BOARDS)
+    pathological = list(PATHOLOGICAL_BOARDS.values())
+    found_paths = [(board, path) for board in boards for path in solve_board(board, index).values()]
+
+    cases = [
+        ("load/words_txt_set", generate_words_set_from_file, scale),
+        ("load/word_index_mmap", lambda: WordIndex(), 20 * scale),
+        ("build/words_prefix_set", lambda: words_prefix_set(words), scale),
+        ("build/word_trie_compact", lambda: WordTrie(words), scale),
+        ("build/word_trie_plain", lambda: WordTrie(words, compact=False), scale),
+        ("is_valid_path/index", cycling(lambda found: is_valid_path(found[0], found[1], index), found_paths),
+         scale * len(found_paths)),
+        ("is_valid_path/set", cycling(lambda found: is_valid_path(found[0], found[1], words), found_paths),
+         scale * len(found_paths)),
+        ("build/letter_signatures", lambda: LetterSignatures(words), scale),
+        ("max_score_paths/words_set", lambda: max_score_paths(boards[0], words), scale),
+        ("max_score_paths/letter_signatures", cycling(lambda b: max_score_paths(b, signatures), boards),
+         scale * len(boards)),
+    ]
+    for name, board_list in (("random", boards), ("pathological", pathological)):
+        repeat = 4 * scale * len(board_list)
+        cases += [
+            (f"find_length_n_paths/{name}/n=3", cycling(lambda b: find_length_n_paths(3, b, index), board_list),
+             repeat),
+            (f"find_length_n_paths/{name}/n=6", cycling(lambda b: find_length_n_paths(6, b, index), board_list),
+             repeat),
+            (f"find_length_n_words/{name}/n=4", cycling(lambda b: find_length_n_words(4, b, index), board_list),
+             repeat),
+            (f"max_score_paths/{name}/index", cycling(lambda b: max_score_paths(b, index), board_list),
+             repeat),
+            (f"max_score_paths/{name}/trie", cycling(lambda b: max_score_paths(b, trie), board_list),
+             repeat),
+        ]
+    # a few words per board (half of them on it), as in the "is this word on the board?" checks
+    few_words = [(board, list(solve_board(board, index))[:5] + sorted(words)[i * 5:i * 5 + 5])
+                 for i, board in enumerate(boards)]
+    for strategy in (BOARD_FIRST, WORD_FIRST):
+        cases.append((f"find_length_n_words/few_words/{strategy}",
+                      cycling(lambda case, strategy=strategy: find_length_n_words(4, case[0], case[1], strategy),
+                              few_words), 4 * scale * len(few_words)))
+    cases.append(("present_words/few_words", cycling(lambda case: present_words(*case), few_words),
+                  4 * scale * len(few_words)))
+    # every random board in all its orientations: after the first orientation, the rest are cache hits
+    symmetric_boards = [[list(row) for row in transform_board(board, symmetry)]
+                        for board in boards for symmetry in range(len(SYMMETRIES))]
+    cache = SolutionCache(index)
+    cases.append(("max_score_paths/random/cached_symmetries", cycling(cache.max_score_paths, symmetric_boards),
+                  scale * len(symmetric_boards)))
+    # the peak memory of this case divided by 1000 is the memory of a single hosted game
+    cases.append(("session/1000_games", lambda: hosted_games(1000), scale))
+    for rows, cols in DICE_SETS:
+        dice_boards = seeded_boards(RANDOM_BOARDS, rows=rows, cols=cols)
+        cases.append((f"max_score_paths/dice/{rows}x{cols}", cycling(lambda b: max_score_paths(b, index), dice_boards),
+                      scale * len(dice_boards)))
+    for rows, cols in LARGE_GRID_SIZES:
+        grid = large_grid(rows, cols)
+        cases.append((f"max_score_paths/grid/{rows}x{cols}", lambda grid=grid: max_score_paths(grid, index), scale))
+    # all the short paths of a large grid, against the first few of them
+    grid = large_grid(*LARGE_GRID_SIZES[2])
+    cases += [
+        ("find_length_n_paths/grid/n=3", lambda: find_length_n_paths(3, grid, index), scale),
+        ("iter_length_n_paths/grid/n=3/limit=10", lambda: list(iter_length_n_paths(3, grid, index, limit=10)),
+         20 * scale),
+        ("count_length_n_paths/grid/n=3", lambda: count_length_n_paths(3, grid, index), scale),
+    ]
+    cases.append(("board_histogram/random", cycling(lambda b: board_histogram(b, index, 2), boards),
+                  4 * scale * len(boards)))
+    return cases
+
+
+def run_suite(quick: bool = False, name_filter: Optional[str] = None,
+              log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Runs the benchmark suite.
+
+    :param quick: Whether to cut the repeats down, for a fast sanity run
+    :param name_filter: Optional substring, only cases whose name contains it run
+    :param log: A function called with a line per finished case
+    :return: A JSON-able dictionary of the run's metadata and the results of every case
+    """
+    results = dict()
+    for name, func, repeat in benchmark_cases(quick):
+        if name_filter and name_filter not in name:
+            continue
+        func()  # warm up
+        results[name] = measure(func, repeat)
+        log(f"{name:45} p50 {results[name]['p50_ms']:10.2f} ms  p99 {results[name]['p99_ms']:10.2f} ms  "
+            f"peak {results[name]['peak_mem_kib']:10.0f} KiB")
+    meta = {"python": sys.version.split()[0], "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": quick}
+    return {"meta": meta, "results": results}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Compares two runs of the suite.
+
+    :param baseline: The results of an earlier run (as returned by run_suite)
+    :param current: The results of the new run
+    :param threshold: The ratio of p50 latency (or peak memory) above which a case counts as a regression
+    :return: A list of descriptions of the regressed cases
+    """
+    regressions = list()
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for key in ("p50_ms", "peak_mem_kib"):
+            if old[key] and result[key] / old[key] > threshold:
+                regressions.append(f"{name}: {key} {old[key]:.2f} -> {result[key]:.2f} "
+                                   f"(x{result[key] / old[key]:.2f})")
+    return regressions
+
+
+def main() -> None:
+    """
+    Command line entry point: runs the suite, saves the results and compares them to a baseline run.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks of the Boggle solver functions.")
+    parser.add_argument("-o", "--output", default=None, help="JSON file to save the results to")
+    parser.add_argument("-c", "--compare", default=None, help="JSON results of an earlier run to compare to")
+    parser.add_argument("-t", "--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio that counts as a regression")
+    parser.add_argument("-k", "--filter", default=None, help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats, for a fast sanity run")
+    args = parser.parse_args()
+
+    current = run_suite(args.quick, args.filter)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+from typing import List, Iterator, Optional, Iterable, Union
+from functools import partial
+from itertools import islice
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from algos import Board, init_data, first_step
+from batch_solver import solve_boards, worker_index, DEFAULT_CHUNKSIZE
+from bulk_randomizer import Seed, randomize_boards, boards_to_lists
+from boggle_board_randomizer import LETTERS, BOARD_SIZE
+from boggle_model import SCORE_POW_MULTIPLIER
+from word_index import WordIndex, WORDS_PATH, INDEX_PATH
+from word_trie import WordTrie
+
+DEFAULT_BATCH_SIZE = 1024
+
+
+class BoardConstraints:
+    """
+    The constraints a generated board has to meet. Every constraint left at its default always passes.
+    Words are counted once each, scored by their highest scoring path, as in the game.
+    """
+
+    def __init__(self, min_words: int = 0, min_score: int = 0, required_lengths: Iterable[int] = (),
+                 max_dead_cells: Optional[int] = None):
+        """
+        :param min_words: The minimum number of words on the board
+        :param min_score: The minimum max score of the board (the score of finding every word on it)
+        :param required_lengths: Word lengths (in letters) that the board must have at least one word of, each
+        :param max_dead_cells: The maximum number of dead cells, cells that no word on the board passes through
+        """
+        self.min_words = min_words
+        self.min_score = min_score
+        self.required_lengths = frozenset(required_lengths)
+        self.max_dead_cells = max_dead_cells
+
+    def __repr__(self) -> str:
+        return (f"BoardConstraints(min_words={self.min_words}, min_score={self.min_score}, "
+                f"required_lengths={sorted(self.required_lengths)}, max_dead_cells={self.max_dead_cells})")
+
+
+class _Tally:
+    """
+    What a search found on a board so far, checked against the constraints after every new word.
+    """
+    __slots__ = ('constraints', 'best_lengths', 'score', 'missing_lengths', 'used_cells', 'used_count',
+                 'needed_cells')
+
+    def __init__(self, constraints: BoardConstraints, cells: int):
+        self.constraints = constraints
+        self.best_lengths = dict()  # of WORD: LENGTH OF ITS LONGEST PATH
+        self.score = 0
+        self.missing_lengths = set(constraints.required_lengths)
+        self.used_cells = bytearray(cells)  # 1 for every cell on any word's path
+        self.used_count = 0
+        max_dead = cells if constraints.max_dead_cells is None else constraints.max_dead_cells
+        self.needed_cells = max(0, cells - max_dead)
+
+    def add(self, word: str, path: List[int]) -> None:
+        """
+        Adds a path (of cell ids) of a word.
+        """
+        best = self.best_lengths.get(word, 0)
+        if len(path) > best:
+            self.best_lengths[word] = len(path)
+            self.score += len(path) ** SCORE_POW_MULTIPLIER - best ** SCORE_POW_MULTIPLIER
+        self.missing_lengths.discard(len(word))
+        for cell in path:
+            if not self.used_cells[cell]:
+                self.used_cells[cell] = 1
+                self.used_count += 1
+
+    def passed(self) -> bool:
+        """
+        :return: True if the words found so far already meet every constraint
+        """
+        return (len(self.best_lengths) >= self.constraints.min_words and self.score >= self.constraints.min_score
+                and not self.missing_lengths and self.used_count >= self.needed_cells)
+
+
+def board_passes(board: Board, constraints: BoardConstraints, words: Union[WordTrie, WordIndex]) -> bool:
+    """
+    Checks if a board meets the constraints. The board is searched like solve_board does, but the search stops
+    as soon as the words found so far meet every constraint, so a good board is usually accepted after a fraction
+    of a full solve. A board is only rejected after a full search.
+
+    :param board: A 2D list representing the board of the game
+    :param constraints: The constraints the board has to meet
+    :param words: A prebuilt WordTrie/WordIndex of the words
+    :return: True if the board meets the constraints
+    """
+    cell_coords, cell_letters, neighbours, trie = init_data(board, words)
+    tally = _Tally(constraints, len(cell_coords))
+    if tally.passed():
+        return True
+    visited = bytearray(len(cell_coords))
+    for cell in range(len(cell_coords)):
+        node = first_step(cell_letters[cell], trie)
+        if node is None:
+            continue
+        visited[cell] = 1
+        if board_passes_helper(cell, visited, [cell], tally, cell_letters, neighbours, trie, node):
+            return True
+        visited[cell] = 0
+    return False
+
+
+def board_passes_helper(cell, visited, cur_path, tally, cell_letters, neighbours, trie, node) -> bool:
+    """
+    A helper function for board_passes that recursively finds the words on the board starting from a given cell,
+    adding them to the tally.
+
+    :param cell: The id of the last cell of the current path.
+    :param visited: A bytearray with a 1 at the id of every cell that is already on the path (updated in place).
+    :param cur_path: The current path being built, as cell ids.
+    :param tally: The _Tally of the words found so far.
+    :param cell_letters: A list of the letters of each cell id.
+    :param neighbours: A list of the neighbouring cell ids of each cell id.
+    :param trie: The WordTrie (or WordIndex) of the words to check the paths against.
+    :param node: The trie node reached by the letters of the current path.
+    :return: True as soon as the tally meets the constraints (the search stops there)
+    """
+    if trie.is_word(node):
+        tally.add("".join(cell_letters[step] for step in cur_path), cur_path)
+        if tally.passed():
+            return True
+
+    for move in neighbours[cell]:
+        if visited[move]:
+            continue
+        next_node = trie.walk(node, cell_letters[move])
+        if next_node is None:
+            continue
+        cur_path.append(move)
+        visited[move] = 1
+        passed = board_passes_helper(move, visited, cur_path, tally, cell_letters, neighbours, trie, next_node)
+        visited[move] = 0
+        cur_path.pop()
+        if passed:
+            return True
+    return False
+
+
+def _qualified_board(constraints: BoardConstraints, board: Board) -> Optional[Board]:
+    """
+    Checks a single candidate board in a worker process.
+    :return: The board if it meets the constraints, otherwise None
+    """
+    return board if board_passes(board, constraints, worker_index()) else None
+
+
+def candidate_boards(seed: Seed = None, batch_size: int = DEFAULT_BATCH_SIZE, dice_list: List[List[str]] = LETTERS,
+                     board_size: int = BOARD_SIZE) -> Iterator[Board]:
+    """
+    An endless stream of random boards, created in batches by the bulk randomizer.
+    The stream only depends on the seed and batch_size.
+    """
+    rng = np.random.default_rng(seed)
+    while True:
+        yield from boards_to_lists(randomize_boards(batch_size, rng, dice_list, board_size), dice_list)
+
+
+def generate_qualified_boards(constraints: BoardConstraints, seed: Seed = None, processes: Optional[int] = None,
+                              max_candidates: Optional[int] = None, dice_list: List[List[str]] = LETTERS,
+                              board_size: int = BOARD_SIZE, words_path: str = WORDS_PATH,
+                              index_path: str = INDEX_PATH) -> Iterator[Board]:
+    """
+    Rejection sampling: checks random boards on a pool of worker processes and yields the ones that meet the
+    constraints, in the order they were created (so a seed always gives the same boards).
+    The candidates are consumed lazily, closing the iterator stops the workers.
+
+    :param constraints: The constraints the boards have to meet
+    :param seed: A seed, SeedSequence or numpy Generator (None for a random one)
+    :param processes: The number of worker processes (defaults to the number of cores), 1 checks in this process
+    :param max_candidates: Optional number of candidates after which the stream stops, for constraints that
+    may be too strict
+    :param dice_list: 2-dimensional list of letters to generate the boards from
+    :param board_size: The number of rows (and columns) of each board
+    :param words_path: The path of the words file
+    :param index_path: The path of the compiled words index
+    :return: An iterator of the qualified boards
+    """
+    candidates = candidate_boards(seed, DEFAULT_BATCH_SIZE, dice_list, board_size)
+    if max_candidates is not None:
+        candidates = islice(candidates, max_candidates)
+    checker = partial(_qualified_board, constraints)
+    for board in solve_boards(candidates, processes, words_path, index_path, DEFAULT_CHUNKSIZE, checker):
+        if board is not None:
+            yield board
+
+
+def generate_boards(count: int, constraints: BoardConstraints, seed: Seed = None, processes: Optional[int] = None,
+                    max_candidates: Optional[int] = None, dice_list: List[List[str]] = LETTERS,
+                    board_size: int = BOARD_SIZE, words_path: str = WORDS_PATH,
+                    index_path: str = INDEX_PATH) -> List[Board]:
+    """
+    Generates boards that meet the constraints (see generate_qualified_boards).
+
+    :param count: The number of boards to generate
+    :return: A list of count boards, or fewer if max_candidates candidates were checked first
+    """
+    boards = generate_qualified_boards(constraints, seed, processes, max_candidates, dice_list, board_size,
+                                       words_path, index_path)
+    try:
+        return list(islice(boards, count))
+    finally:
+        boards.close()
+
+
+def main() -> None:
+    """
+    Command line entry point: writes qualified boards as JSON lines (the input format of batch_solver.py).
+    """
+    parser = argparse.ArgumentParser(description="Generate Boggle boards that meet quality constraints.")
+    parser.add_argument("-n", "--boards", type=int, default=1000, help="number of boards to generate")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="root seed of the candidate boards")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="number of worker processes")
+    parser.add_argument("-o", "--output", default="-", help="boards file, '-' for stdout (default)")
+    parser.add_argument("--min-words", type=int, default=0, help="minimum number of words")
+    parser.add_argument("--min-score", type=int, default=0, help="minimum max score")
+    parser.add_argument("--lengths", type=int, nargs="*", default=(), help="word lengths the board must have")
+    parser.add_argument("--max-dead", type=int, default=None, help="maximum number of cells on no word's path")
+    parser.add_argument("--max-candidates", type=int, default=None, help="give up after this many candidates")
+    parser.add_argument("--words", default=WORDS_PATH, help="words file")
+    parser.add_argument("--index", default=INDEX_PATH, help="compiled words index")
+    args = parser.parse_args()
+
+    constraints = BoardConstraints(args.min_words, args.min_score, args.lengths, args.max_dead)
+    target = sys.stdout if args.output == "-" else open(args.output, 'w')
+    boards = generate_qualified_boards(constraints, args.seed, args.processes, args.max_candidates,
+                                       words_path=args.words, index_path=args.index)
+    written = 0
+    try:
+        for board in islice(boards, args.boards):
+            target.write(json.dumps(board) + "\n")
+            written += 1
+    finally:
+        boards.close()
+        if target is not sys.stdout:
+            target.close()
+    if written < args.boards:
+        print(f"only {written} boards met {constraints}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
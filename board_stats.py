@@ -0,0 +1,247 @@
+from typing import Dict, Iterator, Optional, Callable, Tuple, Any
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from algos import Board, board_histogram
+from batch_solver import solve_boards, worker_index, DEFAULT_CHUNKSIZE
+from bulk_randomizer import randomize_boards, boards_to_lists
+from boggle_board_randomizer import LETTERS, BOARD_SIZE
+from boggle_model import SCORE_POW_MULTIPLIER
+from word_index import WORDS_PATH, INDEX_PATH
+
+DEFAULT_BATCH_SIZE = 10000
+STATS_NAMES = ("words", "max_score", "longest_word")
+REPORTED_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+class Histogram:
+    """
+    A histogram of integer values, which can answer percentiles at any time.
+    Its memory only depends on the number of distinct values, not on the number of values added.
+    """
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        """
+        :param counts: Optional dictionary of value: count to start from (e.g. a loaded checkpoint)
+        """
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+
+    def add(self, value: int) -> None:
+        """
+        Adds a single value to the histogram.
+        """
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.total += 1
+
+    def mean(self) -> float:
+        """
+        :return: The mean of the values added so far (0 if there are none)
+        """
+        if not self.total:
+            return 0.0
+        return sum(value * count for value, count in self.counts.items()) / self.total
+
+    def percentile(self, percent: float) -> Optional[int]:
+        """
+        :param percent: A percentage between 0 and 100
+        :return: The smallest value that at least percent% of the values are less than or equal to
+        (the nearest-rank percentile), or None if the histogram is empty
+        """
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+        return max(self.counts)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of the min, mean, max and the reported percentiles of the histogram
+        """
+        summary = {"min": min(self.counts, default=None), "mean": round(self.mean(), 3),
+                   "max": max(self.counts, default=None)}
+        for percent in REPORTED_PERCENTILES:
+            summary[f"p{percent}"] = self.percentile(percent)
+        return summary
+
+
+class BoardStatistics:
+    """
+    Statistics of a stream of solved boards: a histogram per stat in STATS_NAMES,
+    and the progress of the simulation that feeds them, so a run can be checkpointed and resumed.
+    """
+
+    def __init__(self, seed: int, batch_size: int, batches_done: int = 0,
+                 histograms: Optional[Dict[str, Dict[int, int]]] = None, elapsed: float = 0.0):
+        """
+        :param seed: The root seed of the boards stream
+        :param batch_size: The number of boards in each batch of the stream
+        :param batches_done: The number of full batches already added (the boards of a partial batch are counted
+        in the histograms only)
+        :param histograms: Optional dictionary of stat name: histogram counts to start from
+        :param elapsed: Seconds already spent on the run
+        """
+        self.seed = seed
+        self.batch_size = batch_size
+        self.batches_done = batches_done
+        self.elapsed = elapsed
+        histograms = histograms or {}
+        self.histograms = {name: Histogram(histograms.get(name)) for name in STATS_NAMES}
+
+    @property
+    def boards(self) -> int:
+        """
+        :return: The number of boards added so far
+        """
+        return self.histograms[STATS_NAMES[0]].total
+
+    def add(self, stats: Tuple[int, ...]) -> None:
+        """
+        Adds the stats of a single board, ordered as STATS_NAMES.
+        """
+        for name, value in zip(STATS_NAMES, stats):
+            self.histograms[name].add(value)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of the summary of every stat, and the number of boards
+        """
+        summary = {name: histogram.summary() for name, histogram in self.histograms.items()}
+        summary["boards"] = self.boards
+        return summary
+
+    def save(self, path: str) -> None:
+        """
+        Saves a checkpoint of the statistics to a JSON file (through a temporary file, so it's never half written).
+        """
+        state = {"seed": self.seed, "batch_size": self.batch_size, "batches_done": self.batches_done,
+                 "elapsed": self.elapsed,
+                 "histograms": {name: histogram.counts for name, histogram in self.histograms.items()}}
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BoardStatistics":
+        """
+        Loads statistics from a checkpoint written by save.
+        """
+        with open(path, 'r') as f:
+            state = json.load(f)
+        # JSON keys are always strings, the histograms are of ints
+        histograms = {name: {int(value): count for value, count in counts.items()}
+                      for name, counts in state["histograms"].items()}
+        return cls(state["seed"], state["batch_size"], state["batches_done"], histograms, state["elapsed"])
+
+
+def board_stats(board: Board) -> Tuple[int, int, int]:
+    """
+    Counts the words on a single board with the words index of the current worker, and returns only its stats.
+    No path is ever built, so nothing but these numbers leaves the worker process.
+
+    :param board: A 2D list representing the board of the game
+    :return: A tuple of the number of words on the board, its max score and the length of its longest word
+    """
+    counts = board_histogram(board, worker_index(), SCORE_POW_MULTIPLIER)
+    word_counts = counts["words"]
+    return sum(word_counts.values()), counts["score"], max(word_counts, default=0)
+
+
+def batch_boards(seed: int, batch_size: int, first_board: int, total: int) -> Iterator[Board]:
+    """
+    Creates the boards of a run, from board number first_board up to total. Every batch has its own seed derived
+    from the root seed and its number, and is always created in full and then cut, so a resumed run creates exactly
+    the boards it didn't get to (even the rest of a partial batch), without replaying earlier batches.
+    """
+    for batch in range(first_board // batch_size, -(-total // batch_size)):
+        batch_start = batch * batch_size
+        codes = randomize_boards(batch_size, np.random.SeedSequence(seed, spawn_key=(batch,)), LETTERS, BOARD_SIZE)
+        yield from boards_to_lists(codes[max(0, first_board - batch_start):total - batch_start])
+
+
+def run_simulation(total: int, seed: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                   processes: Optional[int] = None, checkpoint_path: Optional[str] = None,
+                   words_path: str = WORDS_PATH, index_path: str = INDEX_PATH,
+                   report: Optional[Callable[[BoardStatistics, float], None]] = None) -> BoardStatistics:
+    """
+    Generates random boards, solves them on a pool of processes and aggregates their statistics as they stream back.
+    If the checkpoint file exists, the run resumes from it (its seed and batch size win over the given ones),
+    and it is updated after every batch.
+
+    :param total: The total number of boards of the run
+    :param seed: The root seed of the boards stream (None for a random one)
+    :param batch_size: The number of boards between checkpoints
+    :param processes: The number of worker processes (defaults to the number of cores)
+    :param checkpoint_path: Optional path of a JSON checkpoint file
+    :param words_path: The path of the words file
+    :param index_path: The path of the compiled words index
+    :param report: Optional function called after every batch with the statistics and the boards per second
+    :return: The statistics of the run
+    """
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        stats = BoardStatistics.load(checkpoint_path)
+    else:
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        stats = BoardStatistics(seed, batch_size)
+
+    boards = batch_boards(stats.seed, stats.batch_size, stats.boards, total)
+    start_time = time.time()
+    start_boards = stats.boards
+    batch_end = min(total, (stats.batches_done + 1) * stats.batch_size)
+    for board_stat in solve_boards(boards, processes, words_path, index_path, DEFAULT_CHUNKSIZE, board_stats):
+        stats.add(board_stat)
+        if stats.boards == batch_end:
+            # only a full batch is done, a run resumed with a larger total completes a partial last batch
+            if batch_end == (stats.batches_done + 1) * stats.batch_size:
+                stats.batches_done += 1
+            batch_end = min(total, (stats.batches_done + 1) * stats.batch_size)
+            run_time = time.time() - start_time
+            if checkpoint_path:
+                stats.elapsed += run_time
+                stats.save(checkpoint_path)
+                stats.elapsed -= run_time
+            if report:
+                report(stats, (stats.boards - start_boards) / max(run_time, 1e-9))
+    stats.elapsed += time.time() - start_time
+    return stats
+
+
+def print_progress(stats: BoardStatistics, boards_per_second: float) -> None:
+    """
+    Prints a progress line of a run.
+    """
+    print(f"{stats.boards} boards ({stats.batches_done} batches), {boards_per_second:.0f} boards/s")
+
+
+def main() -> None:
+    """
+    Command line entry point: runs a simulation and prints the summary of its statistics as JSON.
+    """
+    parser = argparse.ArgumentParser(description="Monte-Carlo statistics of random Boggle boards.")
+    parser.add_argument("-n", "--boards", type=int, default=100000, help="total number of boards")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="root seed of the boards")
+    parser.add_argument("-b", "--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="boards per checkpoint")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="number of worker processes")
+    parser.add_argument("-c", "--checkpoint", default=None, help="checkpoint file, the run resumes from it if exists")
+    parser.add_argument("--words", default=WORDS_PATH, help="words file")
+    parser.add_argument("--index", default=INDEX_PATH, help="compiled words index")
+    args = parser.parse_args()
+
+    stats = run_simulation(args.boards, args.seed, args.batch_size, args.processes, args.checkpoint,
+                           args.words, args.index, print_progress)
+    print(json.dumps(stats.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
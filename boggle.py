@@ -1,10 +1,169 @@
-import boggle_gui
+import time
+# taken before the other imports, so the startup profile counts them too
+STARTUP_TIME = time.perf_counter()
+
 import boggle_gui as gui
 import boggle_model as model
-import pygame
+import argparse
+import os
+import queue
+import sys
+import threading
+import traceback
 
 INITIAL_MSG = "WELCOME TO BOGGLE!"
+LOADING_MSG = "LOADING WORDS..."
+LOADING_FAILED_MSG = "COULDN'T LOAD THE WORDS"
 BOARD_SIZE = 4
+# how often the GUI drains the results of the background worker (well under a frame)
+POLL_INTERVAL_MS = 10
+MEDIA_DIR = "media"
+SOUND_EXTENSIONS = (".mp3", ".wav")
+# the number of sound effects that can play at the same time
+SOUND_CHANNELS = 8
+FIRST_FRAME_TARGET_MS = 200
+
+
+class BackgroundWorker:
+    """
+    A worker thread that runs the slow work of the game (loading the words index, waiting for board solves)
+    away from the Tk main loop. Results are put on a queue, and the GUI drains it with drain_results() from an
+    after() callback, so every callback of a job still runs on the main thread.
+    """
+
+    def __init__(self) -> None:
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="boggle-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, job, on_done, on_error=None) -> None:
+        """
+        Queues a job for the worker thread.
+        :param job: A function with no arguments, called on the worker thread
+        :param on_done: A function called with the job's result on the thread that drains the results
+        :param on_error: Optional function called with the exception if the job raises one, on the thread that
+        drains the results (without it, the exception is printed to stderr)
+        """
+        self._jobs.put((job, on_done, on_error))
+
+    def drain_results(self) -> None:
+        """
+        Calls the on_done callbacks of all the finished jobs, without blocking.
+        """
+        while True:
+            try:
+                on_done, result = self._results.get_nowait()
+            except queue.Empty:
+                return
+            on_done(result)
+
+    def _work(self) -> None:
+        """
+        The worker thread loop: runs the jobs one after the other and queues their results.
+        A job that raises doesn't stop the loop, its exception is handled instead of its result.
+        """
+        while True:
+            job, on_done, on_error = self._jobs.get()
+            try:
+                result = job()
+            except Exception as error:
+                if on_error is None:
+                    traceback.print_exc(file=sys.stderr)
+                else:
+                    self._results.put((on_error, error))
+                continue
+            self._results.put((on_done, result))
+
+
+class StartupProfile:
+    """
+    Times the startup of the game: every mark is the time since STARTUP_TIME (the start of the imports).
+    """
+
+    def __init__(self, start_time: float = STARTUP_TIME) -> None:
+        """
+        :param start_time: The time.perf_counter() the marks are measured from
+        """
+        self._start_time = start_time
+        self.marks = dict()  # of NAME: MILLISECONDS SINCE THE START, in the order they were marked
+
+    def mark(self, name: str) -> None:
+        """
+        Records the time of a startup step (only its first time).
+        """
+        self.marks.setdefault(name, (time.perf_counter() - self._start_time) * 1000)
+
+    def report(self) -> str:
+        """
+        :return: A printable report of the marks, and whether the first frame met FIRST_FRAME_TARGET_MS
+        """
+        lines = [f"{name:20} {ms:8.1f} ms" for name, ms in self.marks.items()]
+        first_frame = self.marks.get("first_frame")
+        if first_frame is not None:
+            verdict = "OK" if first_frame <= FIRST_FRAME_TARGET_MS else "SLOW"
+            lines.append(f"time to first frame {first_frame:.1f} ms (target {FIRST_FRAME_TARGET_MS} ms): {verdict}")
+        return "\n".join(lines)
+
+
+class SoundCache:
+    """
+    The sound effects of the game, decoded once into memory, and played on a small pool of mixer channels,
+    so playing a sound costs no disk I/O and effects overlap instead of cutting each other off.
+    pygame itself is only imported (and the mixer started) by load, so it stays off the startup path.
+    """
+
+    def __init__(self, channels: int = SOUND_CHANNELS) -> None:
+        """
+        :param channels: The number of mixer channels, the most sounds that can play at the same time
+        """
+        self._channels = channels
+        self._pygame = None  # the pygame module, once the mixer is ready
+        self._sounds = dict()  # of PATH: pygame.mixer.Sound (None if the file can't be decoded as a Sound)
+
+    def load(self, media_dir: str = MEDIA_DIR) -> None:
+        """
+        Starts the mixer and decodes every sound file of the media directory. It's meant to run on a background
+        thread: sounds played before the mixer is ready are skipped, and sounds that aren't decoded yet are
+        streamed from disk meanwhile.
+        Without pygame or an audio device, the game just stays silent.
+        :param media_dir: The directory of the sound files
+        """
+        try:
+            import pygame
+        except ImportError as error:
+            print(f"sounds disabled: {error}", file=sys.stderr)
+            return
+        try:
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(self._channels)
+        except pygame.error as error:
+            print(f"sounds disabled: {error}", file=sys.stderr)
+            return
+        self._pygame = pygame
+        for file_name in sorted(os.listdir(media_dir)):
+            if file_name.endswith(SOUND_EXTENSIONS):
+                path = media_dir + "/" + file_name
+                try:
+                    self._sounds[path] = pygame.mixer.Sound(path)
+                except pygame.error:
+                    # older SDL_mixer builds can't decode mp3 into a Sound, keep streaming that file
+                    self._sounds[path] = None
+
+    def play(self, path: str) -> None:
+        """
+        Plays a sound on a free channel, taking over the channel that has played the longest if none is free.
+        :param path: The path of the sound file
+        """
+        pygame = self._pygame
+        if pygame is None:
+            return
+        sound = self._sounds.get(path)
+        if sound is None:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.play()
+            return
+        pygame.mixer.find_channel(True).play(sound)
 
 
 class BoggleController:
@@ -13,21 +172,87 @@ class BoggleController:
     and creates actions for different game events such as picking a letter,
     undoing the last letter picked, starting/resetting the game, and activating party mode.
     """
-    # pygame.mixer used to play sound effects
-    pygame.mixer.init()
 
-    def __init__(self) -> None:
+    def __init__(self, profile: StartupProfile = None, rows: int = BOARD_SIZE, cols: int = BOARD_SIZE) -> None:
+        """
+        Initializes the Boggle game by creating a GUI, and then creates the game model and loads the sound effects
+        on the background worker (loading the words index may take a while, the first time it's compiled),
+        so the window shows up first. The actions for the different game events are created once the model is ready.
+        :param profile: Optional StartupProfile, printed once everything is loaded
+        :param rows: The number of rows of the board
+        :param cols: The number of columns of the board
         """
-        Initializes the Boggle game by creating a GUI and a game model, and then creates actions
-        for the different game events.
+        self._profile = profile or StartupProfile()
+        self._profile.mark("imports")
+        self._cols = cols
+        self._gui = gui.BoggleGUI(rows, cols)
+        self._profile.mark("window_built")
+        self._model = None
+        self._worker = BackgroundWorker()
+        self._sounds = SoundCache()
+        self._gui.set_display(LOADING_MSG)
+        self._worker.submit(lambda: model.BoggleBoard(rows, cols, solve_in_background=True), self._model_ready,
+                            self._model_failed)
+        # the worker runs its jobs in order, so the sounds are the last thing to load
+        self._worker.submit(self._sounds.load, self._sounds_ready)
+        self._gui.schedule(POLL_INTERVAL_MS, self._poll_worker)
+        self._gui.on_first_frame(lambda: self._profile.mark("first_frame"))
+        self._print_profile = profile is not None
+
+    def _poll_worker(self):
         """
-        self._gui = gui.BoggleGUI()
-        self._model = model.BoggleBoard()
+        Drains the results of the background worker on the main loop, and schedules itself again.
+        """
+        self._worker.drain_results()
+        self._gui.schedule(POLL_INTERVAL_MS, self._poll_worker)
+
+    def _model_ready(self, game_model):
+        """
+        Called on the main loop once the background worker has created the game model.
+        :param game_model: The BoggleBoard of the game
+        """
+        self._profile.mark("model_ready")
+        self._model = game_model
         self.init_cubes()
+        self.create_cube_actions()
         self.create_pick_action()
         self.create_undo_action()
         self.create_start_reset_action()
         self.create_party_action()
+        self._gui.set_display(INITIAL_MSG)
+
+    def _model_failed(self, error):
+        """
+        Called on the main loop if the background worker couldn't create the game model (e.g. the words file
+        is missing), the game can't start without it.
+        :param error: The exception raised while creating the model
+        """
+        print(f"couldn't load the words: {error!r}", file=sys.stderr)
+        self._gui.set_display(LOADING_FAILED_MSG)
+
+    def _sounds_ready(self, result):
+        """
+        Called on the main loop once the sound effects are loaded, the last step of the startup.
+        """
+        self._profile.mark("sounds_ready")
+        if self._print_profile:
+            print(self._profile.report())
+
+    def _board_solved(self, solution):
+        """
+        Called on the main loop once the background solve of a board has finished, shows the number of words
+        on the board. The solution may belong to an earlier board, so the counts are read from the model.
+        """
+        self._gui.set_found_words_count(self._model.get_found_words_count(), self._words_total())
+
+    def _words_total(self):
+        """
+        :return: The number of words on the current board, or None if it isn't solved yet
+        """
+        remaining = self._model.get_words_remaining()
+        if remaining is None:
+            return None
+        return remaining + self._model.get_found_words_count()
 
     def create_cube_action(self, coord):
         """
@@ -41,15 +266,10 @@ class BoggleController:
             updates the current word and the current path, and checks if the word is valid.
             also handles all the logic behind logging the click and activating gui reactions
             """
-            if self._model.path_is_valid(self._model.get_current_path() + [coord]):
+            if self._model.is_valid_next_step(coord):
                 self._model.update_current_path(coord)
                 self._gui.set_display(self._model.get_current_word())
-                # compute the cube's list index from the coord (in a 4x4 board)
-                cube_index = coord[0]*BOARD_SIZE + coord[1]
-                cube = self._gui.cubes[cube_index]
-                cube.marked = True
-                cube["background"] = self._gui.hue_red_color(
-                    len(self._model.get_current_path()))
+                self._gui.mark_cube(self._cube_index(coord), self._gui.hue_red_color(len(self._model.get_current_path())))
                 self.play_sound("media/click.mp3")
             else:
                 return
@@ -61,29 +281,22 @@ class BoggleController:
         The pick_action method is called when the user submits the current word they have selected on the boggle board.
         If the word is valid, it updates the score, adds the word to the list of found words and plays a sound effect.
         If the word is not valid, it clears the current word and plays a sound effect.
-        Additionally, it resets the colors of the cubes on the board.
+        Additionally, it resets the colors of the cubes of the submitted path (all of them in party mode).
         """
+        path = self._model.get_current_path()
         word = self._model.submit_word()
         if word:
-            self._gui.update_found_words(self._model.get_found_words())
+            self._gui.add_found_word(word, self._model.get_found_words_count(), self._words_total())
             self._gui.set_score(self._model.get_score())
             self.play_sound("media/correct.mp3")
         else:
             self._model.clear_current_word()
             self.play_sound("media/error.mp3")
-        for index, cube in enumerate(self._gui.cubes):
-            cube.marked = False
-            # reset colors based on party mode ON/OFF
-            if self._gui.party_mode:
-                cube["bg"] = self._gui.random_color()
-            else:
-                self._gui.party_mode_disabled()
-                # revert to the distinct and beloved checkers pattern
-                row, col = index // BOARD_SIZE, index % BOARD_SIZE  # calc row,col from index
-                if row % 2 == col % 2:
-                    cube["bg"] = boggle_gui.REGULAR_COLOR_2
-                else:
-                    cube["bg"] = boggle_gui.REGULAR_COLOR_1
+        if self._gui.party_mode:
+            self._gui.reset_cubes()
+        else:
+            # only the cubes of the path were marked, the rest already show the checkers pattern
+            self._gui.reset_cubes(map(self._cube_index, path))
         # reset the display to a blank label
         self._gui.set_display("")
 
@@ -95,34 +308,31 @@ class BoggleController:
         """
         popped_cube_coord = self._model.undo_last_step()
         if popped_cube_coord:
-            cube_index = popped_cube_coord[0] * \
-                BOARD_SIZE + popped_cube_coord[1]
-            cube = self._gui.cubes[cube_index]
-            cube.marked = False
-            # reset color based on party mode ON/OFF
-            if self._gui.party_mode:
-                cube["bg"] = self._gui.random_color()
-            else:
-                self._gui.party_mode_disabled()
-                # revert to the distinct and beloved checkers pattern
-                if popped_cube_coord[0] % 2 == popped_cube_coord[1] % 2:
-                    cube["bg"] = boggle_gui.REGULAR_COLOR_2
-                else:
-                    cube["bg"] = boggle_gui.REGULAR_COLOR_1
+            self._gui.reset_cubes([self._cube_index(popped_cube_coord)])
         self._gui.set_display(self._model.get_current_word())
         self.play_sound("media/undo.mp3")
 
+    def _cube_index(self, coord):
+        """
+        :param coord: The coordinates of a cube
+        :return: The index of the cube in the GUI's cubes list (which is ordered row by row)
+        """
+        return coord[0] * self._cols + coord[1]
+
     def init_cubes(self):
         """
         The init_cubes method is used to initialize the cubes on the boggle board.
-        It sets the text of each cube to the corresponding character and assigns the appropriate action to each cube.
+        It sets the text of each cube to the corresponding character.
         """
-        board_coords = self._model.get_board_coords()
-        for index, char in enumerate(self._model.get_chars_list()):
-            cur_cube = self._gui.cubes[index]
-            action = self.create_cube_action(board_coords[index])
-            cur_cube["text"] = char
-            cur_cube.configure(command=action)
+        self._gui.set_cube_chars(self._model.get_chars_list())
+
+    def create_cube_actions(self):
+        """
+        Assigns the appropriate action to each cube. The actions only depend on the coordinates of the cubes,
+        so they're created once, not on every reset.
+        """
+        for index, coord in enumerate(self._model.get_board_coords()):
+            self._gui.cubes[index].configure(command=self.create_cube_action(coord))
 
     def start_action(self):
         """
@@ -135,18 +345,15 @@ class BoggleController:
         self._gui.set_display(INITIAL_MSG)
         self._gui.set_score(self._model.get_score())
         self._gui.update_found_words(self._model.get_found_words())
+        # the model is already solving the new board, wait for it on the worker and show the words count when done
+        board_model = self._model
+        self._worker.submit(lambda: board_model.get_board_solution(wait=True), self._board_solved)
         self.init_cubes()
         self._gui.reset_timer()
         self.play_sound("media/new-round.wav")
         self._gui.party_mode_disabled()
-        for index, cube in enumerate(self._gui.cubes):
-            row, col = index // BOARD_SIZE, index % BOARD_SIZE  # calc row,col from index
-            cube.marked = False
-            # revert to the distinct and beloved checkers pattern
-            if row % 2 == col % 2:
-                cube["bg"] = boggle_gui.REGULAR_COLOR_2
-            else:
-                cube["bg"] = boggle_gui.REGULAR_COLOR_1
+        # revert to the distinct and beloved checkers pattern, only repainting the cubes that aren't in it
+        self._gui.reset_cubes()
 
     def party_action(self):
         """
@@ -184,11 +391,10 @@ class BoggleController:
 
     def play_sound(self, soundtrack: str):
         """
-        Plays the given sound effect.
+        Plays the given sound effect, from the sound cache.
         :param soundtrack: str:  path of the sound effect file
         """
-        pygame.mixer.music.load(soundtrack)
-        pygame.mixer.music.play()
+        self._sounds.play(soundtrack)
 
     def run(self) -> None:
         """
@@ -198,7 +404,13 @@ class BoggleController:
 
 
 if __name__ == '__main__':
-    boggle_game = BoggleController()
-    
+    parser = argparse.ArgumentParser(description="Boggle.")
+    parser.add_argument("--profile-startup", action="store_true", help="print the startup timing report")
+    parser.add_argument("--rows", type=int, default=BOARD_SIZE, help="rows of the board (5 for Big Boggle)")
+    parser.add_argument("--cols", type=int, default=None, help="columns of the board (as many as rows by default)")
+    args = parser.parse_args()
+    boggle_game = BoggleController(StartupProfile() if args.profile_startup else None, args.rows,
+                                   args.cols or args.rows)
+
     # Enjoy :)
     boggle_game.run()
@@ -1,5 +1,6 @@
 import random
-from typing import List
+from itertools import cycle, islice
+from typing import List, Optional
 
 
 BOARD_SIZE = 4
@@ -21,21 +22,74 @@ LETTERS = [
     ['T', 'E', 'R', 'W', 'H', 'V'],
     ['N', 'U', 'I', 'H', 'M', 'QU']
 ]
+# the 25 dice of Big Boggle (5x5)
+BIG_BOGGLE_LETTERS = [
+    ['A', 'A', 'A', 'F', 'R', 'S'], ['A', 'A', 'E', 'E', 'E', 'E'], ['A', 'A', 'F', 'I', 'R', 'S'],
+    ['A', 'D', 'E', 'N', 'N', 'N'], ['A', 'E', 'E', 'E', 'E', 'M'], ['A', 'E', 'E', 'G', 'M', 'U'],
+    ['A', 'E', 'G', 'M', 'N', 'N'], ['A', 'F', 'I', 'R', 'S', 'Y'], ['B', 'J', 'K', 'QU', 'X', 'Z'],
+    ['C', 'C', 'N', 'S', 'T', 'W'], ['C', 'E', 'I', 'I', 'L', 'T'], ['C', 'E', 'I', 'L', 'P', 'T'],
+    ['C', 'E', 'I', 'P', 'S', 'T'], ['D', 'D', 'L', 'N', 'O', 'R'], ['D', 'H', 'H', 'L', 'O', 'R'],
+    ['D', 'H', 'H', 'N', 'O', 'T'], ['D', 'H', 'L', 'N', 'O', 'R'], ['E', 'I', 'I', 'I', 'T', 'T'],
+    ['E', 'M', 'O', 'T', 'T', 'T'], ['E', 'N', 'S', 'S', 'S', 'U'], ['F', 'I', 'P', 'R', 'S', 'Y'],
+    ['G', 'O', 'R', 'R', 'V', 'W'], ['H', 'I', 'P', 'R', 'R', 'Y'], ['N', 'O', 'O', 'T', 'U', 'W'],
+    ['O', 'O', 'O', 'T', 'T', 'U']
+]
+# the 36 dice of Super Big Boggle (6x6), '~' is a blank face that no word can pass through
+SUPER_BIG_BOGGLE_LETTERS = [
+    ['A', 'A', 'A', 'F', 'R', 'S'], ['A', 'A', 'E', 'E', 'E', 'E'], ['A', 'A', 'E', 'E', 'O', 'O'],
+    ['A', 'A', 'F', 'I', 'R', 'S'], ['A', 'B', 'D', 'E', 'I', 'O'], ['A', 'D', 'E', 'N', 'N', 'N'],
+    ['A', 'E', 'E', 'E', 'E', 'M'], ['A', 'E', 'E', 'G', 'M', 'U'], ['A', 'E', 'G', 'M', 'N', 'N'],
+    ['A', 'E', 'I', 'L', 'M', 'N'], ['A', 'E', 'I', 'N', 'O', 'U'], ['A', 'F', 'I', 'R', 'S', 'Y'],
+    ['AN', 'ER', 'HE', 'IN', 'QU', 'TH'], ['B', 'B', 'J', 'K', 'X', 'Z'], ['C', 'C', 'E', 'N', 'S', 'T'],
+    ['C', 'D', 'D', 'L', 'N', 'N'], ['C', 'E', 'I', 'I', 'T', 'T'], ['C', 'E', 'I', 'P', 'S', 'T'],
+    ['C', 'F', 'G', 'N', 'U', 'Y'], ['D', 'D', 'H', 'N', 'O', 'T'], ['D', 'H', 'H', 'L', 'O', 'R'],
+    ['D', 'H', 'H', 'N', 'O', 'W'], ['D', 'H', 'L', 'N', 'O', 'R'], ['E', 'H', 'I', 'L', 'R', 'S'],
+    ['E', 'I', 'I', 'L', 'S', 'T'], ['E', 'I', 'L', 'P', 'S', 'T'], ['E', 'I', 'O', '~', '~', '~'],
+    ['E', 'M', 'T', 'T', 'T', 'O'], ['E', 'N', 'S', 'S', 'S', 'U'], ['G', 'O', 'R', 'R', 'V', 'W'],
+    ['H', 'I', 'R', 'S', 'T', 'V'], ['H', 'O', 'P', 'R', 'S', 'T'], ['I', 'P', 'R', 'S', 'Y', 'Y'],
+    ['J', 'K', 'QU', 'W', 'X', 'Z'], ['N', 'O', 'O', 'T', 'U', 'W'], ['O', 'O', 'O', 'T', 'T', 'U']
+]
+# the dice of every board size that has a dice set of its own
+DICE_SETS = {(4, 4): LETTERS, (5, 5): BIG_BOGGLE_LETTERS, (6, 6): SUPER_BIG_BOGGLE_LETTERS}
+
+
+def dice_for_size(rows: int, cols: int) -> List[List[str]]:
+    """
+    Returns the dice for a board of the given size: its own dice set if it has one (see DICE_SETS),
+    otherwise the smallest dice set with enough dice, or the largest dice set repeated as many times as needed.
+    :param rows: The number of rows of the board.
+    :param cols: The number of columns of the board.
+    :return: 2-dimensional list of letters, with at least rows * cols dice.
+    """
+    if (rows, cols) in DICE_SETS:
+        return DICE_SETS[rows, cols]
+    cells = rows * cols
+    dice_sets = sorted(DICE_SETS.values(), key=len)
+    for dice_list in dice_sets:
+        if len(dice_list) >= cells:
+            return dice_list
+    return list(islice(cycle(dice_sets[-1]), cells))
 
 
-def randomize_board(dice_list: List[List[str]] = LETTERS) -> List[List[str]]:
+def randomize_board(dice_list: List[List[str]] = LETTERS, rows: int = BOARD_SIZE,
+                    cols: Optional[int] = None) -> List[List[str]]:
     """
     Creates a random Boggle board.
-    :param dice_list: 2-dimensional list of letters to generate the board from.
+    :param dice_list: 2-dimensional list of letters to generate the board from (see dice_for_size).
+    :param rows: The number of rows of the board.
+    :param cols: The number of columns of the board (the same as rows by default).
     :return: a 2D list of strings representing a random Boggle board.
     """
+    cols = rows if cols is None else cols
+    if rows * cols > len(dice_list):
+        raise ValueError(f"a {rows}x{cols} board needs at least {rows * cols} dice")
     dice_indices = list(range(len(dice_list)))
     random.shuffle(dice_indices)
     dice_indices_iter = iter(dice_indices)
     board = []
-    for i in range(BOARD_SIZE):
+    for i in range(rows):
         row = []
-        for j in range(BOARD_SIZE):
+        for j in range(cols):
             die = dice_list[next(dice_indices_iter)]
             letter = random.choice(die)
             row.append(letter)
@@ -46,3 +100,5 @@ def randomize_board(dice_list: List[List[str]] = LETTERS) -> List[List[str]]:
 if __name__ == "__main__":
     from pprint import pprint
     pprint(randomize_board())
+    pprint(randomize_board(BIG_BOGGLE_LETTERS, 5))
+    pprint(randomize_board(SUPER_BIG_BOGGLE_LETTERS, 6))
@@ -20,6 +20,13 @@ INITIAL_GREEN = 208
 INITIAL_BLUE = 208
 GB_DELTA = 13
 BOARD_SIZE = 4
+ICON_PATH = "media/boggle_color_icon.ico"
+MEME_PATH = "media/doge1.gif"
+FOUND_WORDS_HEADER = "  WORDS FOUND:"
+CUBE_MIN_FONT_SIZE = 8
+# the found words panel only renders the newest words, and renders older ones a page at a time as they're
+# scrolled to, so it stays as fast with thousands of found words
+FOUND_WORDS_SHOWN = 300
 
 
 class BoggleGUI:
@@ -33,15 +40,26 @@ class BoggleGUI:
     _timer: Any = None
     _current_time = 0
 
-    def __init__(self) -> None:
+    def __init__(self, rows: int = BOARD_SIZE, cols: int = BOARD_SIZE) -> None:
         """
         Initializes the GUI elements, creates the main window, and sets up the layout of the various frames and widgets.
-        """
+        :param rows: The number of rows of cubes
+        :param cols: The number of columns of cubes
+        """
+        self._rows = rows
+        self._cols = cols
+        # the last background set on every cube, so only cubes whose color changes are reconfigured
+        self._cube_colors: List[Any] = []
+        self._clickable = None
+        self._found_list: List[str] = []  # every word found so far, oldest first
+        self._shown_words = 0  # the number of the newest found words rendered in the text box
+        self._shown_limit = FOUND_WORDS_SHOWN  # grows by a page whenever older words are scrolled to
 
         root = tki.Tk()
         root.geometry("770x415")
         root.title("BOGGLE © by Arie Levental and Adir Barak")
-        root.iconbitmap("media/boggle_color_icon.ico")
+        # the icon and images aren't needed for the first frame, they're loaded once the main loop is idle
+        root.after_idle(lambda: root.iconbitmap(ICON_PATH))
         root.resizable(False, False)
         self._main_window = root
 
@@ -73,7 +91,7 @@ class BoggleGUI:
         self._lower_frame.pack(side=tki.TOP, fill=tki.BOTH, expand=True)
         self._create_cubes_in_lower_frame()
 
-        self.meme = tki.PhotoImage(file="media/doge1.gif")
+        self.meme = None  # the party mode image, loaded on first use
 
     def run(self):
         """
@@ -82,6 +100,22 @@ class BoggleGUI:
         self.buttons["START"].configure(state=tki.NORMAL)
         self._main_window.mainloop()
 
+    def on_first_frame(self, callback: Callable[[], Any]) -> None:
+        """
+        Calls the callback once the main loop has drawn the window for the first time
+        (Tk draws in idle handlers, and this one is queued after those of the widgets).
+        :param callback: A function with no arguments
+        """
+        self._main_window.after_idle(callback)
+
+    def schedule(self, delay_ms: int, callback: Callable[[], Any]) -> None:
+        """
+        Calls the callback on the main loop after the given delay.
+        :param delay_ms: The delay in milliseconds
+        :param callback: A function with no arguments
+        """
+        self._main_window.after(delay_ms, callback)
+
     def set_display(self, display_text: str) -> None:
         """
         Update the display text on the GUI.
@@ -149,20 +183,70 @@ class BoggleGUI:
         """
         self._current_time = TIMER_MAX
 
-    def update_found_words(self, word_list):
+    def update_found_words(self, word_list, words_total=None):
         """
-        Updates the text box that displays the found words.
+        Replaces the contents of the text box that displays the found words (newest first).
+        Only the newest FOUND_WORDS_SHOWN words are rendered, older ones are rendered once they're scrolled to.
         :param word_list: List of words found so far
+        :param words_total: Optional number of words on the board, shown next to the number of words found
         """
         # word_label = tki.Label(self._sidebar_frame, font=("Courier", 15), bg=REGULAR_COLOR_1, width=5, relief="ridge",
         #                        text=word)
+        self._found_list = list(word_list)
+        self._shown_limit = FOUND_WORDS_SHOWN
         self._found_words.configure(state=tki.NORMAL)
         self._found_words.delete("1.0", tki.END)
-        self._found_words.insert("1.0", "  WORDS FOUND:\n")
-        for word in word_list:
-            self._found_words.insert("2.0", "- " + word + "\n")
+        self._found_words.insert("1.0", self._found_words_header(len(word_list), words_total) + "\n")
+        shown = word_list[-FOUND_WORDS_SHOWN:]
+        self._found_words.insert("2.0", "".join("- " + word + "\n" for word in reversed(shown)))
+        self._shown_words = len(shown)
+        self._found_words.configure(state=tki.DISABLED)
+
+    def add_found_word(self, word, found_count, words_total=None):
+        """
+        Adds a single word to the top of the found words text box, without touching the words already in it.
+        Once the box is full, the oldest rendered word stops being rendered (scrolling down renders it again).
+        :param word: The newly found word
+        :param found_count: The number of words found so far (including the new one)
+        :param words_total: Optional number of words on the board
+        """
+        self._found_list.append(word)
+        self._found_words.configure(state=tki.NORMAL)
+        self._found_words.insert("2.0", "- " + word + "\n")
+        if self._shown_words == self._shown_limit:
+            # the header is line 1, so the oldest rendered word is the last full line
+            self._found_words.delete(f"{self._shown_limit + 2}.0", tki.END)
+        else:
+            self._shown_words += 1
+        self._set_found_words_header(found_count, words_total)
+        self._found_words.configure(state=tki.DISABLED)
+
+    def set_found_words_count(self, found_count, words_total=None):
+        """
+        Updates only the header line of the found words text box.
+        :param found_count: The number of words found so far
+        :param words_total: Optional number of words on the board
+        """
+        self._found_words.configure(state=tki.NORMAL)
+        self._set_found_words_header(found_count, words_total)
         self._found_words.configure(state=tki.DISABLED)
 
+    def _set_found_words_header(self, found_count, words_total):
+        """
+        Replaces the header line of the (already editable) found words text box.
+        """
+        self._found_words.delete("1.0", "1.end")
+        self._found_words.insert("1.0", self._found_words_header(found_count, words_total))
+
+    @staticmethod
+    def _found_words_header(found_count, words_total):
+        """
+        :return: The header line of the found words text box
+        """
+        if words_total is None:
+            return FOUND_WORDS_HEADER
+        return f"{FOUND_WORDS_HEADER} {found_count}/{words_total}"
+
     def _initialize_word_scroll_box(self):
         """
         Initialize the scroll box for displaying the found words.
@@ -170,13 +254,33 @@ class BoggleGUI:
         scrollbar = tki.Scrollbar(self._sidebar_frame, orient='vertical')
         scrollbar.pack(side=tki.RIGHT, fill='y')
         # Add some text in the text widget
-        self._found_words = tki.Text(self._sidebar_frame, font=("Courier", 15), yscrollcommand=scrollbar.set,
-                                     bg=REGULAR_COLOR_1, width=5, relief="ridge")
-        self._found_words.insert("1.0", "  WORDS FOUND:\n")
+        self._found_words_scrollbar = scrollbar
+        self._found_words = tki.Text(self._sidebar_frame, font=("Courier", 15),
+                                     yscrollcommand=self._on_found_words_scroll, bg=REGULAR_COLOR_1, width=5,
+                                     relief="ridge")
+        self._found_words.insert("1.0", FOUND_WORDS_HEADER + "\n")
         self._found_words.configure(state=tki.DISABLED)
         found_words = self._found_words.yview
         scrollbar.config(command=found_words)
 
+    def _on_found_words_scroll(self, first, last):
+        """
+        Moves the scrollbar with the found words text box, and renders the next page of older words
+        once the bottom of the rendered words is scrolled to.
+        :param first: The fraction of the text above the visible part
+        :param last: The fraction of the text up to the end of the visible part
+        """
+        self._found_words_scrollbar.set(first, last)
+        if float(last) < 1.0 or self._shown_words >= len(self._found_list):
+            return
+        older_end = len(self._found_list) - self._shown_words
+        older = self._found_list[max(0, older_end - FOUND_WORDS_SHOWN):older_end]
+        self._found_words.configure(state=tki.NORMAL)
+        self._found_words.insert(tki.END, "".join("- " + word + "\n" for word in reversed(older)))
+        self._found_words.configure(state=tki.DISABLED)
+        self._shown_words += len(older)
+        self._shown_limit = max(self._shown_limit, self._shown_words)
+
     def _create_buttons_in_upper_frame(self) -> None:
         """
         Create the buttons in the upper frame of the GUI.
@@ -231,40 +335,32 @@ class BoggleGUI:
         Creates the cubes (which are buttons) in the lower frame, with a grid layout.
         The cubes also have hover and leave event handlers to change their background color.
         """
-        for i in range(4):
+        for i in range(self._cols):
             tki.Grid.columnconfigure(self._lower_frame, i, weight=1)  # type: ignore
 
-        for i in range(4):
+        for i in range(self._rows):
             tki.Grid.rowconfigure(self._lower_frame, i, weight=1)  # type: ignore
 
-        self._make_cube("A", 0, 0)
-        self._make_cube("B", 0, 1)
-        self._make_cube("C", 0, 2)
-        self._make_cube("D", 0, 3)
-        self._make_cube("E", 1, 0)
-        self._make_cube("F", 1, 1)
-        self._make_cube("G", 1, 2)
-        self._make_cube("H", 1, 3)
-        self._make_cube("I", 2, 0)
-        self._make_cube("J", 2, 1)
-        self._make_cube("K", 2, 2)
-        self._make_cube("L", 2, 3)
-        self._make_cube("M", 3, 0)
-        self._make_cube("N", 3, 1)
-        self._make_cube("O", 3, 2)
-        self._make_cube("P", 3, 3)
-
-    def _make_cube(self, cube_chars: str, row: int, col: int, rowspan: int = 1, columnspan: int = 1) -> tki.Button:
+        # the cubes share the same frame on any board size, so their font shrinks as the board grows
+        font_size = max(CUBE_MIN_FONT_SIZE, BUTTON_STYLE["font"][1] * BOARD_SIZE // max(self._rows, self._cols))
+        for row in range(self._rows):
+            for col in range(self._cols):
+                self._make_cube("", row, col, font_size=font_size)
+
+    def _make_cube(self, cube_chars: str, row: int, col: int, rowspan: int = 1, columnspan: int = 1,
+                   font_size: int = BUTTON_STYLE["font"][1]) -> tki.Button:
         """
         Creates a game cube represented by a tkinter button object, and adds the cube to the cubes_list.
         :return:
         """
         cube = tki.Button(self._lower_frame, text=cube_chars, **BUTTON_STYLE)
+        cube["font"] = (BUTTON_STYLE["font"][0], font_size)
         cube.marked = False
-        if row % 2 == col % 2:
-            cube["bg"] = REGULAR_COLOR_2
-        cube.grid(row=row, column=col, rowspan=rowspan, columnspan=columnspan, sticky=tki.NSEW)
+        index = len(self.cubes)
         self.cubes.append(cube)
+        self._cube_colors.append(BUTTON_STYLE["bg"])
+        self.paint_cube(index, self.checkers_color(index))
+        cube.grid(row=row, column=col, rowspan=rowspan, columnspan=columnspan, sticky=tki.NSEW)
 
         def _on_enter(event: Any) -> None:
             """
@@ -275,9 +371,9 @@ class BoggleGUI:
             if cube.marked:
                 return
             if self.party_mode:
-                cube["background"] = self.random_color()
+                self.paint_cube(index, self.random_color())
             else:
-                cube["background"] = BUTTON_HOVER_COLOR
+                self.paint_cube(index, BUTTON_HOVER_COLOR)
 
         def _on_leave(event: Any) -> None:
             """
@@ -288,34 +384,82 @@ class BoggleGUI:
             if cube.marked:
                 return
             if self.party_mode:
-                cube["background"] = self.random_color()
+                self.paint_cube(index, self.random_color())
             else:
-                if row % 2 == col % 2:
-                    cube["background"] = REGULAR_COLOR_2
-                else:
-                    cube["background"] = REGULAR_COLOR_1
+                self.paint_cube(index, self.checkers_color(index))
 
         cube.bind("<Enter>", _on_enter)
         cube.bind("<Leave>", _on_leave)
         cube.configure(state=tki.DISABLED)
         return cube
 
+    def paint_cube(self, index, color):
+        """
+        Sets the background of a cube, only reconfiguring the cube if its color actually changes.
+        :param index: The index of the cube in self.cubes
+        :param color: The new background color
+        """
+        if self._cube_colors[index] != color:
+            self.cubes[index]["bg"] = color
+            self._cube_colors[index] = color
+
+    def mark_cube(self, index, color):
+        """
+        Marks a cube as part of the current path and paints it.
+        :param index: The index of the cube in self.cubes
+        :param color: The color of the marked cube
+        """
+        self.cubes[index].marked = True
+        self.paint_cube(index, color)
+
+    def reset_cubes(self, indices=None):
+        """
+        Unmarks cubes and reverts them to the checkers pattern (or random colors in party mode).
+        :param indices: Optional iterable of the indices of the cubes to reset, all the cubes by default
+        """
+        if indices is None:
+            indices = range(len(self.cubes))
+        for index in indices:
+            self.cubes[index].marked = False
+            self.paint_cube(index, self.random_color() if self.party_mode else self.checkers_color(index))
+
+    def set_cube_chars(self, chars):
+        """
+        Sets the text of every cube, only reconfiguring the cubes whose text changes.
+        :param chars: List of the characters of every cube, in the order of self.cubes
+        """
+        for cube, char in zip(self.cubes, chars):
+            if cube["text"] != char:
+                cube["text"] = char
+
+    def checkers_color(self, index):
+        """
+        :param index: The index of a cube in the cubes list
+        :return: The color of the cube in the distinct and beloved checkers pattern
+        """
+        row, col = index // self._cols, index % self._cols
+        if row % 2 == col % 2:
+            return REGULAR_COLOR_2
+        return REGULAR_COLOR_1
+
     def party_mode_activated(self):
         """
         Activates party mode, which changes the background color of the buttons and cubes to a random color.
         """
         self.party_mode = 1
         # self.play_sound("media/cute_song.mp3")
-        for cube in self.cubes:
+        for index, cube in enumerate(self.cubes):
             if cube.marked:
                 continue
-            cube["bg"] = self.random_color()
+            self.paint_cube(index, self.random_color())
 
         for button in self.buttons.values():
             button["bg"] = self.random_color()
         self._timer["bg"] = self.random_color()
         self._score["bg"] = self.random_color()
         self._found_words["bg"] = self.random_color()
+        if self.meme is None:
+            self.meme = tki.PhotoImage(file=MEME_PATH)
         self.buttons["PARTY"]["image"] = self.meme
         self._display_label["bg"] = self.random_color()
 
@@ -328,11 +472,7 @@ class BoggleGUI:
         for index, cube in enumerate(self.cubes):
             if cube.marked:
                 continue
-            row, col = index // BOARD_SIZE, index % BOARD_SIZE
-            if row % 2 == col % 2:
-                cube["background"] = REGULAR_COLOR_2
-            else:
-                cube["background"] = REGULAR_COLOR_1
+            self.paint_cube(index, self.checkers_color(index))
 
         for button in self.buttons.values():
             button["bg"] = REGULAR_COLOR_1
@@ -346,6 +486,10 @@ class BoggleGUI:
         """
         This function freezes the game while timer count is at 0, only the Start/Reset button will be available to click
         """
+        # called every second, but the widgets only need reconfiguring when the state flips
+        if self._clickable == bool(mode):
+            return
+        self._clickable = bool(mode)
         for cube in self.cubes:
             if mode:
                 cube.configure(state=tki.NORMAL)
@@ -369,7 +513,7 @@ class BoggleGUI:
     def hue_red_color(self, multipler):
         """
         generates a red hue in rgb format then translates it to hex and returns the hex color
-        :param multipler: an int (1-16)
+        :param multipler: an int, the length of the current path
         :returns a string descring a hex color:
         """
         # make the red stronger and brighter when the multiplier is a bigger number
@@ -0,0 +1,266 @@
+from typing import Dict, Any, Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from batch_solver import init_worker, solve_one
+from boggle_board_randomizer import BOARD_SIZE
+from boggle_model import BoggleBoard, PATH_TO_WORD_BANK, PATH_TO_WORD_INDEX, SCORE_POW_MULTIPLIER
+from word_index import load_word_index, shared_word_index
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# the largest number of rows or columns a client can ask for
+MAX_BOARD_SIDE = 16
+
+
+class BoggleServer:
+    """
+    A headless Boggle server, hosting many BoggleBoard games on a single asyncio event loop.
+    Clients talk to it over TCP with JSON lines: every request line is an object with an "op" field
+    (new, click, undo, submit, score, solve, close), and it gets a single JSON line back.
+    A "new" request may set the "rows" and "cols" of the board, it's 4x4 by default.
+    Game moves only touch the in-memory game and the shared words index, so they're answered right on the loop,
+    while full board solves run on a process pool, only when a client asks for one. The "remaining" words of
+    a game's score are None until its board was solved.
+    """
+
+    def __init__(self, solver_processes: Optional[int] = None):
+        """
+        :param solver_processes: The number of processes solving boards (defaults to the number of cores)
+        """
+        self._games: Dict[int, BoggleBoard] = dict()
+        self._session_ids = count(1)
+        self._solver_processes = solver_processes
+        self._solver_pool: Optional[ProcessPoolExecutor] = None
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handles a single request of a game move (every op but solve).
+
+        :param request: The request object
+        :return: The response object, with an "error" field if the request couldn't be handled
+        """
+        op = request.get("op")
+        if op == "new":
+            rows = request.get("rows", BOARD_SIZE)
+            cols = request.get("cols", rows)
+            if not all(isinstance(side, int) and 0 < side <= MAX_BOARD_SIDE for side in (rows, cols)):
+                return {"error": f"rows and cols must be between 1 and {MAX_BOARD_SIDE}"}
+            game = BoggleBoard(rows, cols)
+            game.reset_board()
+            session = next(self._session_ids)
+            self._games[session] = game
+            return {"session": session, "board": game.get_board()}
+
+        game = self._games.get(request.get("session"))
+        if game is None:
+            return {"error": "unknown session"}
+        if op == "click":
+            cell = request.get("cell")
+            rows, cols = game.get_board_shape()
+            # only exact integers: a float cell hashes like its integer cell, but can't index the board
+            if not (isinstance(cell, list) and len(cell) == 2 and all(type(index) is int for index in cell)
+                    and 0 <= cell[0] < rows and 0 <= cell[1] < cols):
+                return {"error": "cell must be a [row, col] pair of integers on the board"}
+            coord = tuple(cell)
+            if not game.is_valid_next_step(coord):
+                return {"ok": False, "word": game.get_current_word()}
+            game.update_current_path(coord)
+            return {"ok": True, "word": game.get_current_word(),
+                    "prefix": game.current_word_is_prefix(), "is_word": game.current_word_is_word()}
+        if op == "undo":
+            popped = game.undo_last_step()
+            return {"ok": popped is not None, "word": game.get_current_word()}
+        if op == "submit":
+            word = game.submit_word()
+            if word is None:
+                game.clear_current_word()
+            return {"word": word, "score": game.get_score()}
+        if op == "score":
+            return {"score": game.get_score(), "found": game.get_found_words(),
+                    "remaining": game.get_words_remaining()}
+        if op == "close":
+            del self._games[request["session"]]
+            return {"ok": True}
+        return {"error": f"unknown op {op!r}"}
+
+    async def handle_solve(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Solves the board of a game on the solver process pool, without blocking the event loop.
+
+        :param request: The request object
+        :return: The response object, with every word on the board and the board's max score
+        """
+        game = self._games.get(request.get("session"))
+        if game is None:
+            return {"error": "unknown session"}
+        loop = asyncio.get_running_loop()
+        board = game.get_board()
+        result = await loop.run_in_executor(self._get_solver_pool(), solve_one, board)
+        # the game looks its submissions and remaining words up in the solution from now on
+        game.set_board_solution(board, {word: (tuple(map(tuple, path)), len(path) ** SCORE_POW_MULTIPLIER)
+                                        for word, path in result["words"].items()})
+        return {"words": sorted(result["words"]), "max_score": result["score"]}
+
+    def _get_solver_pool(self) -> ProcessPoolExecutor:
+        """
+        Starts the solver process pool on first use, every process maps the words index once.
+        """
+        if self._solver_pool is None:
+            load_word_index(PATH_TO_WORD_BANK, PATH_TO_WORD_INDEX)
+            self._solver_pool = ProcessPoolExecutor(self._solver_processes, initializer=init_worker,
+                                                    initargs=(PATH_TO_WORD_INDEX,))
+        return self._solver_pool
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves a single client connection, a JSON line response for every JSON line request.
+        The games the client started and didn't close are closed when it disconnects.
+        """
+        sessions = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if request.get("op") == "solve":
+                        response = await self.handle_solve(request)
+                    else:
+                        response = self.handle_request(request)
+                        if request.get("op") == "new" and "session" in response:
+                            sessions.add(response["session"])
+                        elif request.get("op") == "close":
+                            sessions.discard(request.get("session"))
+                except (ValueError, AttributeError, TypeError) as e:
+                    response = {"error": str(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            for session in sessions:
+                self._games.pop(session, None)
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """
+        Starts listening. The words index is loaded before the first client connects.
+
+        :return: The asyncio server (its sockets tell the actual port, if port 0 was given)
+        """
+        shared_word_index(PATH_TO_WORD_BANK, PATH_TO_WORD_INDEX)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def close(self) -> None:
+        """
+        Stops the solver process pool, if it was started.
+        """
+        if self._solver_pool is not None:
+            self._solver_pool.shutdown()
+            self._solver_pool = None
+
+
+#############################################################
+#                                                           #
+#                      load generator                       #
+#                                                           #
+#############################################################
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: Dict[str, Any],
+                   latencies: List[float]) -> Dict[str, Any]:
+    """
+    Sends a request and waits for its response, recording the latency.
+    """
+    start = time.perf_counter()
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    latencies.append(time.perf_counter() - start)
+    return response
+
+
+async def _play(host: str, port: int, deadline: float, latencies: List[float], seed: int) -> None:
+    """
+    A single simulated player: starts a game and clicks random neighbouring cells, undoing and submitting
+    along the way, until the deadline.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    game = await _request(reader, writer, {"op": "new"}, latencies)
+    session, board = game["session"], game["board"]
+    try:
+        while time.perf_counter() < deadline:
+            for _ in range(rng.randint(2, 6)):
+                cell = [rng.randrange(len(board)), rng.randrange(len(board[0]))]
+                await _request(reader, writer, {"op": "click", "session": session, "cell": cell}, latencies)
+            if rng.random() < 0.3:
+                await _request(reader, writer, {"op": "undo", "session": session}, latencies)
+            await _request(reader, writer, {"op": "submit", "session": session}, latencies)
+        await _request(reader, writer, {"op": "close", "session": session}, latencies)
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, clients: int, duration: float) -> Dict[str, float]:
+    """
+    Runs many simulated players against a running server for a while, and measures it.
+
+    :param host: The host of the server
+    :param port: The port of the server
+    :param clients: The number of concurrent players (one connection each)
+    :param duration: The number of seconds to play
+    :return: A dictionary of the number of requests, requests per second, and latency percentiles in milliseconds
+    """
+    latencies: List[float] = list()
+    start = time.perf_counter()
+    await asyncio.gather(*(_play(host, port, start + duration, latencies, seed) for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def latency_percentile(percent):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))] * 1000
+
+    return {"requests": len(latencies), "requests_per_s": len(latencies) / elapsed,
+            "p50_ms": latency_percentile(50), "p99_ms": latency_percentile(99)}
+
+
+async def _serve_forever(host: str, port: int, solver_processes: Optional[int]) -> None:
+    """
+    Runs the server until it's interrupted.
+    """
+    boggle_server = BoggleServer(solver_processes)
+    server = await boggle_server.serve(host, port)
+    print(f"serving Boggle on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        boggle_server.close()
+
+
+def main() -> None:
+    """
+    Command line entry point: 'serve' runs the server, 'load' runs the load generator against a running server.
+    """
+    parser = argparse.ArgumentParser(description="Headless Boggle game server.")
+    parser.add_argument("mode", choices=("serve", "load"))
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--solver-processes", type=int, default=None, help="processes solving boards (serve)")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent simulated players (load)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (load)")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        asyncio.run(_serve_forever(args.host, args.port, args.solver_processes))
+    else:
+        print(json.dumps(asyncio.run(run_load(args.host, args.port, args.clients, args.duration)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from typing import List, Iterator, Optional, Union, Tuple
+import numpy as np
+
+from boggle_board_randomizer import LETTERS, BOARD_SIZE
+
+Seed = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+
+def face_tables(dice_list: List[List[str]] = LETTERS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flattens the faces of all the dice into a single table, so a rolled face can be stored as a small int code.
+    The code of face j of die i is offsets[i] + j.
+
+    :param dice_list: 2-dimensional list of letters to generate the boards from.
+    :return: A tuple of the faces table (an object array of the face strings), the code of the first face of
+    each die, and the number of faces of each die
+    """
+    counts = np.array([len(die) for die in dice_list], dtype=np.intp)
+    offsets = np.zeros(len(dice_list), dtype=np.intp)
+    np.cumsum(counts[:-1], out=offsets[1:])
+    faces = np.empty(int(counts.sum()), dtype=object)
+    faces[:] = [face for die in dice_list for face in die]
+    return faces, offsets, counts
+
+
+def randomize_boards(count: int, seed: Seed = None, dice_list: List[List[str]] = LETTERS,
+                     board_size: int = BOARD_SIZE, cols: Optional[int] = None) -> np.ndarray:
+    """
+    Creates many random Boggle boards at once, the same way randomize_board creates one:
+    the dice are shuffled into the cells, and every die shows one of its faces at random.
+
+    :param count: The number of boards to create.
+    :param seed: A seed, SeedSequence or numpy Generator, boards from the same seed are always the same.
+    :param dice_list: 2-dimensional list of letters to generate the boards from.
+    :param board_size: The number of rows (and columns, unless cols is given) of each board.
+    :param cols: The number of columns of each board, for rectangular boards.
+    :return: An array of shape (count, board_size, cols) of face codes (see face_tables).
+    """
+    cols = board_size if cols is None else cols
+    rng = np.random.default_rng(seed)
+    faces, offsets, counts = face_tables(dice_list)
+    cells = board_size * cols
+    if cells > len(dice_list):
+        raise ValueError(f"a {board_size}x{cols} board needs at least {cells} dice")
+
+    # shuffle the dice of every board, and keep as many as there are cells
+    dice = rng.permuted(np.broadcast_to(np.arange(len(dice_list)), (count, len(dice_list))), axis=1)[:, :cells]
+    # roll every die: a random face out of its own faces
+    rolls = (rng.random((count, cells)) * counts[dice]).astype(np.intp)
+    codes = (offsets[dice] + rolls).astype(np.min_scalar_type(len(faces) - 1))
+    return codes.reshape(count, board_size, cols)
+
+
+def boards_to_lists(codes: np.ndarray, dice_list: List[List[str]] = LETTERS) -> List[List[List[str]]]:
+    """
+    Converts boards of face codes to the usual List[List[str]] boards.
+    The cells reference the face strings of the faces table, no string is copied.
+
+    :param codes: An array of boards of face codes, as returned by randomize_boards.
+    :param dice_list: The dice the boards were created from.
+    :return: A list of 2D lists of strings.
+    """
+    faces = face_tables(dice_list)[0]
+    return faces[codes].tolist()
+
+
+def board_batches(total: int, batch_size: int, seed: Seed = None, dice_list: List[List[str]] = LETTERS,
+                  board_size: int = BOARD_SIZE) -> Iterator[np.ndarray]:
+    """
+    Creates random boards in batches, for streams too large to hold in memory at once.
+    The stream only depends on the seed and batch_size.
+
+    :param total: The total number of boards to create.
+    :param batch_size: The number of boards in each batch (the last batch may be smaller).
+    :param seed: A seed, SeedSequence or numpy Generator.
+    :param dice_list: 2-dimensional list of letters to generate the boards from.
+    :param board_size: The number of rows (and columns) of each board.
+    :return: An iterator of arrays of face codes, as returned by randomize_boards.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, total, batch_size):
+        yield randomize_boards(min(batch_size, total - start), rng, dice_list, board_size)
+
+
+def spawn_seeds(seed: Optional[int], streams: int) -> List[np.random.SeedSequence]:
+    """
+    Splits one seed into independent seeds, so parallel workers can create reproducible, non-overlapping streams.
+
+    :param seed: The root seed (None for a random one).
+    :param streams: The number of independent seeds.
+    :return: A list of SeedSequence, one per stream.
+    """
+    return np.random.SeedSequence(seed).spawn(streams)
+
+
+if __name__ == "__main__":
+    from pprint import pprint
+    pprint(boards_to_lists(randomize_boards(3)))
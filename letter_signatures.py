@@ -0,0 +1,98 @@
+from typing import Iterable, Iterator, List
+
+import numpy as np
+
+# the letters of a word are a bit each in a 64 bit mask, letters past the first 63 share the last bit
+MASK_BITS = 64
+# a word's count of a single letter is kept in a byte, more copies than that are counted as the maximum
+MAX_LETTER_COUNT = 255
+# the signatures are counted a chunk of words at a time, so the counting's temporary arrays stay small
+SIGNATURES_CHUNK = 16384
+
+
+class LetterSignatures:
+    """
+    A collection of words with a precomputed letter signature for each word: a bitmask of its letters and
+    a vector of how many times it uses each letter.
+    A board can only have the words whose letters all appear on its cells, at least as many times as the word
+    uses them, so a search for a single board builds its trie of these possible words only (see possible_words).
+    It can be passed as the words of any of the algos functions, instead of a set of the same words.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        """
+        :param words: An iterable collection of words
+        """
+        self.words = list(dict.fromkeys(words))
+        self._words_set = frozenset(self.words)
+        alphabet = sorted(set("".join(self.words)))
+        self.letters = {char: column for column, char in enumerate(alphabet)}
+
+        self.counts = np.zeros((len(self.words), len(alphabet)), dtype=np.uint8)
+        self.masks = np.zeros(len(self.words), dtype=np.uint64)
+        for start in range(0, len(self.words), SIGNATURES_CHUNK):
+            counts = self._letter_counts(self.words[start:start + SIGNATURES_CHUNK])
+            self.counts[start:start + SIGNATURES_CHUNK] = counts
+            self.masks[start:start + SIGNATURES_CHUNK] = self._letters_mask(counts > 0)
+
+    def _letter_counts(self, words: List[str]) -> np.ndarray:
+        """
+        :param words: A chunk of the words
+        :return: A 2D array of how many times each word uses each letter of the alphabet
+        """
+        # every letter of every word as (word number, letter column), counted all at once
+        lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        word_ids = np.repeat(np.arange(len(words), dtype=np.int64), lengths)
+        columns = np.fromiter((self.letters[char] for word in words for char in word), dtype=np.int64,
+                              count=int(lengths.sum()))
+        counts = np.bincount(word_ids * len(self.letters) + columns, minlength=len(words) * len(self.letters))
+        return np.minimum(counts, MAX_LETTER_COUNT).reshape(len(words), len(self.letters))
+
+    @staticmethod
+    def _letters_mask(present: np.ndarray) -> np.ndarray:
+        """
+        :param present: A 2D boolean array, with a column per letter of the alphabet
+        :return: The bitmask of the letters of every row
+        """
+        if present.shape[1] > MASK_BITS:
+            present = np.hstack((present[:, :MASK_BITS - 1], present[:, MASK_BITS - 1:].any(axis=1, keepdims=True)))
+        bits = np.left_shift(np.uint64(1), np.arange(present.shape[1], dtype=np.uint64))
+        # the bits are distinct, so their sum is their bitwise or
+        return (present * bits).sum(axis=1, dtype=np.uint64)
+
+    def board_signature(self, board: List[List[str]]):
+        """
+        :param board: A 2D list representing the board of the game
+        :return: A tuple of the bitmask of the letters on the board's cells, and a vector of how many times
+        each letter appears on them (a cell of several letters counts each of them)
+        """
+        counts = np.zeros(len(self.letters), dtype=np.int64)
+        for row in board:
+            for letters in row:
+                for char in letters:
+                    column = self.letters.get(char)
+                    if column is not None:
+                        counts[column] += 1
+        return self._letters_mask((counts > 0)[np.newaxis, :])[0], counts
+
+    def possible_words(self, board: List[List[str]]) -> List[str]:
+        """
+        Prunes the words that can't be on the board: first by the bitmasks of their letters,
+        and then the remaining words by the counts of their letters.
+
+        :param board: A 2D list representing the board of the game
+        :return: A list of the words that may be on the board, in the order of the collection
+        """
+        board_mask, board_counts = self.board_signature(board)
+        candidates = np.flatnonzero((self.masks & ~board_mask) == 0)
+        enough = (self.counts[candidates] <= board_counts).all(axis=1)
+        return [self.words[word] for word in candidates[enough]]
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._words_set
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
@@ -0,0 +1,176 @@
+from typing import Dict, List, Tuple, Callable, Iterable, Any
+from collections import OrderedDict
+
+from algos import Board, Path, solve_board
+
+DEFAULT_MAX_BOARDS = 4096
+DEFAULT_MAX_CELLS = 4 * 1024 * 1024
+
+BoardKey = Tuple[Tuple[str, ...], ...]
+# maps a cell (row, col) of a rows x cols board to its cell on the transformed board
+Transform = Callable[[int, int, int, int], Tuple[int, int]]
+
+# the 8 symmetries of a board (the dihedral group of the square): rotations, then reflections.
+# a board and any of its symmetries have exactly the same words, on the mapped paths.
+# the ones that swap rows and columns turn a rows x cols board into a cols x rows one.
+SYMMETRIES: Tuple[Tuple[Transform, bool], ...] = (
+    (lambda r, c, rows, cols: (r, c), False),                        # identity
+    (lambda r, c, rows, cols: (c, rows - 1 - r), True),              # rotate 90 clockwise
+    (lambda r, c, rows, cols: (rows - 1 - r, cols - 1 - c), False),  # rotate 180
+    (lambda r, c, rows, cols: (cols - 1 - c, r), True),              # rotate 270 clockwise
+    (lambda r, c, rows, cols: (r, cols - 1 - c), False),             # mirror left-right
+    (lambda r, c, rows, cols: (rows - 1 - r, c), False),             # mirror top-bottom
+    (lambda r, c, rows, cols: (c, r), True),                         # transpose
+    (lambda r, c, rows, cols: (cols - 1 - c, rows - 1 - r), True),   # anti-transpose
+)
+
+
+def is_rectangular(board: Board) -> bool:
+    """
+    :param board: A 2D list representing the board of the game
+    :return: Whether all the rows of the board have the same length
+    """
+    return len(set(map(len, board))) <= 1
+
+
+def transform_board(board: Board, symmetry: int) -> BoardKey:
+    """
+    :param board: A rectangular 2D list representing the board of the game
+    :param symmetry: An index into SYMMETRIES
+    :return: The transformed board, as a tuple of row tuples
+    :raises ValueError: If the board isn't rectangular (its symmetries aren't boards of the same cells)
+    """
+    if not is_rectangular(board):
+        raise ValueError("only a rectangular board can be transformed")
+    transform, swaps = SYMMETRIES[symmetry]
+    rows, cols = len(board), len(board[0]) if board else 0
+    new_rows, new_cols = (cols, rows) if swaps else (rows, cols)
+    transformed = [[''] * new_cols for _ in range(new_rows)]
+    for r in range(rows):
+        for c in range(cols):
+            new_r, new_c = transform(r, c, rows, cols)
+            transformed[new_r][new_c] = board[r][c]
+    return tuple(map(tuple, transformed))
+
+
+def canonical_board(board: Board) -> Tuple[BoardKey, int]:
+    """
+    Finds the canonical form of a board: the smallest of its 8 symmetries (comparing the rows' strings),
+    so every rotation and reflection of a board has the same canonical form.
+
+    :param board: A rectangular 2D list representing the board of the game
+    :return: A tuple of the canonical board (a tuple of row tuples) and the index of the symmetry that leads to it
+    :raises ValueError: If the board isn't rectangular
+    """
+    return min((transform_board(board, symmetry), symmetry) for symmetry in range(len(SYMMETRIES)))
+
+
+def _inverse_transform(symmetry: int, rows: int, cols: int) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    :return: A dictionary mapping every cell of the transformed board back to its cell on the rows x cols board
+    """
+    transform = SYMMETRIES[symmetry][0]
+    return {transform(r, c, rows, cols): (r, c) for r in range(rows) for c in range(cols)}
+
+
+class SolutionCache:
+    """
+    A cache of board solutions (as returned by solve_board) for a single collection of words.
+    Boards are keyed by their canonical form, so the 8 rotations and reflections of a board share a single entry,
+    and the cached paths are mapped back to the orientation of the board that is asked about.
+    The least recently used boards are evicted once there are more than max_boards boards,
+    or more than max_cells cells on all the cached paths together.
+    """
+
+    def __init__(self, words: Iterable[str], max_boards: int = DEFAULT_MAX_BOARDS,
+                 max_cells: int = DEFAULT_MAX_CELLS):
+        """
+        :param words: The words every board is solved against (preferably a prebuilt WordTrie/WordIndex)
+        :param max_boards: The largest number of cached boards
+        :param max_cells: The largest total length of the cached paths
+        """
+        self.words = words
+        self.max_boards = max_boards
+        self.max_cells = max_cells
+        # CANONICAL BOARD: (SOLUTION IN CANONICAL COORDINATES, NUMBER OF CELLS ON ITS PATHS)
+        self._entries: "OrderedDict[BoardKey, Tuple[Dict[str, Tuple[Tuple[int, int], ...]], int]]" = OrderedDict()
+        self._cells = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def solve_board(self, board: Board) -> Dict[str, Path]:
+        """
+        Solves a board like algos.solve_board, from the cache if the board (or a symmetry of it) was solved before.
+        On a hit, each word's path is a highest scoring path of that word, but it may be a different one of
+        the same length than a fresh solve would find.
+        A board that isn't rectangular has no symmetries, so it's solved directly and isn't cached.
+
+        :param board: A 2D list representing the board of the game
+        :return: A dictionary of word: path, with paths in the coordinates of the given board
+        """
+        if not is_rectangular(board):
+            return solve_board(board, self.words)
+        key, symmetry = canonical_board(board)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            canonical_paths = solve_board([list(row) for row in key], self.words)
+            solution = {word: tuple(path) for word, path in canonical_paths.items()}
+            entry = (solution, sum(map(len, solution.values())))
+            self._store(key, entry)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        rows, cols = len(board), len(board[0]) if board else 0
+        to_board = _inverse_transform(symmetry, rows, cols)
+        return {word: [to_board[cell] for cell in path] for word, path in entry[0].items()}
+
+    def max_score_paths(self, board: Board) -> List[Path]:
+        """
+        Like algos.max_score_paths, from the cache.
+        """
+        return sorted(self.solve_board(board).values(), key=len, reverse=True)
+
+    def _store(self, key: BoardKey, entry: Tuple[Dict[str, Tuple[Tuple[int, int], ...]], int]) -> None:
+        """
+        Adds an entry, evicting the least recently used ones while the cache is over its limits.
+        A single solution larger than max_cells isn't cached at all.
+        """
+        if entry[1] > self.max_cells:
+            return
+        self._entries[key] = entry
+        self._cells += entry[1]
+        while len(self._entries) > self.max_boards or self._cells > self.max_cells:
+            _, (_, cells) = self._entries.popitem(last=False)
+            self._cells -= cells
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        """
+        :return: The number of cached boards
+        """
+        return len(self._entries)
+
+    def hit_rate(self) -> float:
+        """
+        :return: The fraction of the lookups that were answered from the cache (0 before the first lookup)
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of the cache's hits, misses, hit rate, evictions, and current size
+        """
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate(), 4),
+                "evictions": self.evictions, "boards": len(self._entries), "cells": self._cells}
+
+    def clear(self) -> None:
+        """
+        Drops every cached board (the statistics are kept).
+        """
+        self._entries.clear()
+        self._cells = 0
+
@@ -0,0 +1,763 @@
+from algos import *
+from batch_solver import solve_boards, read_binary_boards, write_binary_boards
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+import io
+import subprocess
+import sys
+import pytest
+from boggle import BackgroundWorker, StartupProfile, SoundCache
+from boggle_model import BoggleBoard
+from boggle_board_randomizer import randomize_board, dice_for_size, BIG_BOGGLE_LETTERS
+from boggle_server import BoggleServer, run_load
+import boggle_model
+from solution_cache import SolutionCache, SYMMETRIES, transform_board, canonical_board
+from word_trie import WordTrie
+from word_index import WordIndex, compile_index, load_word_index
+
+
+# noinspection Duplicates
+class TestWordTrie:
+
+    def test_contains(self):
+        trie = WordTrie(["CAT", "CATS", "DOG"])
+        assert "CAT" in trie
+        assert "CATS" in trie
+        assert "CA" not in trie
+        assert "DOGS" not in trie
+        assert len(trie) == 3
+
+    def test_walk_prefixes(self):
+        trie = WordTrie(["QUEEN", "QUIT"])
+        node = trie.walk(trie.root, "QU")
+        assert node is not None
+        assert not trie.is_word(node)
+        assert trie.is_word(trie.walk(node, "IT"))
+        assert trie.walk(node, "A") is None
+
+    def test_compact_shares_suffixes(self):
+        trie = WordTrie(["BATS", "CATS"])
+        assert trie.walk(trie.root, "B") is trie.walk(trie.root, "C")
+        trie = WordTrie(["BATS", "CATS"], compact=False)
+        assert trie.walk(trie.root, "B") is not trie.walk(trie.root, "C")
+
+    def test_prebuilt_trie_as_words(self):
+        board = [['C', 'A', 'T', 'Q'],
+                 ['D', 'O', 'G', 'Q'],
+                 ['B', 'I', 'T', 'Q'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        words = {'CAT', 'DOG', 'BIT', 'COG', 'DOGS'}
+        trie = WordTrie(words)
+        assert is_valid_path(board, [(0, 0), (0, 1), (0, 2)], trie) == "CAT"
+        assert sorted(find_length_n_words(3, board, trie)) == sorted(find_length_n_words(3, board, words))
+        assert sorted(find_length_n_paths(3, board, trie)) == sorted(find_length_n_paths(3, board, words))
+        assert sorted(max_score_paths(board, trie)) == sorted(max_score_paths(board, words))
+
+    def test_empty_cell_is_not_a_prefix(self):
+        board = [['', 'A'],
+                 ['B', 'Q']]
+        assert find_length_n_paths(2, board, ['A', 'AB', 'BA']) == [[(0, 1), (0, 0)], [(0, 1), (1, 0)], [(1, 0), (0, 1)]]
+        assert find_length_n_words(1, board, ['A']) == [[(0, 1)]]
+
+
+# noinspection Duplicates
+class TestSolveBoard:
+
+    def test_longest_path_per_word(self):
+        board = [['A', 'B'],
+                 ['B', 'A']]
+        solved = solve_board(board, ['AB', 'ABBA', 'BAA', 'AAA', 'CAB'])
+        assert set(solved) == {'AB', 'ABBA', 'BAA'}
+        assert solved['ABBA'] == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+    def test_multi_letter_cell_prefers_longer_path(self):
+        board = [['QU', 'Q'],
+                 ['U', 'IT']]
+        solved = solve_board(board, ['QUIT'])
+        assert solved['QUIT'] == [(0, 1), (1, 0), (1, 1)]
+
+    def test_max_score_paths_ordered_by_length(self):
+        board = [['C', 'A', 'T', 'S'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        assert max_score_paths(board, ['CAT', 'CATS', 'AT']) == [[(0, 0), (0, 1), (0, 2), (0, 3)],
+                                                               [(0, 0), (0, 1), (0, 2)],
+                                                               [(0, 1), (0, 2)]]
+
+
+# noinspection Duplicates
+class TestWordIndex:
+
+    def test_compiled_index_matches_trie(self, tmp_path):
+        words = ['CAT', 'CATS', 'DOG', 'QUEEN', 'QUIT']
+        index_path = str(tmp_path / "words.idx")
+        compile_index(words, index_path)
+        index = WordIndex(index_path)
+        assert len(index) == 5
+        assert list(index) == sorted(words)
+        assert 'CATS' in index
+        assert 'CA' not in index
+        assert 'CAB' not in index
+        assert index.walk(index.root, 'QUX') is None
+        assert not index.is_word(index.walk(index.root, 'QU'))
+
+    def test_concurrent_compiles(self, tmp_path):
+        index_path = str(tmp_path / "words.idx")
+        words = [f"W{number}" for number in range(2000)]
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda _: compile_index(words, index_path), range(8)))
+        assert list(WordIndex(index_path)) == sorted(words)
+        assert [path.name for path in tmp_path.iterdir()] == ["words.idx"]
+
+    def test_solvers_on_index(self, tmp_path):
+        board = [['C', 'A', 'T', 'Q'],
+                 ['D', 'O', 'G', 'Q'],
+                 ['B', 'I', 'T', 'Q'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        words = {'CAT', 'DOG', 'BIT', 'COG', 'DOGS'}
+        words_path = tmp_path / "words.txt"
+        words_path.write_text("\n".join(words))
+        index = load_word_index(str(words_path), str(tmp_path / "words.idx"))
+        assert sorted(find_length_n_words(3, board, index)) == sorted(find_length_n_words(3, board, words))
+        assert sorted(max_score_paths(board, index)) == sorted(max_score_paths(board, words))
+
+
+# noinspection Duplicates
+class TestBatchSolver:
+
+    BOARDS = [[['C', 'A', 'T', 'Q'],
+               ['D', 'O', 'G', 'Q'],
+               ['B', 'I', 'T', 'Q'],
+               ['Q', 'Q', 'Q', 'QU']],
+              [['D', 'O', 'G'],
+               ['Q', 'Q', 'Q']]]
+
+    def test_results_in_order(self, tmp_path):
+        words_path = tmp_path / "words.txt"
+        words_path.write_text("CAT\nDOG\nBIT\nDOGS")
+        for processes, cache_size in ((1, None), (2, None), (1, 16)):
+            results = list(solve_boards(self.BOARDS * 3, processes, str(words_path), str(tmp_path / "words.idx"),
+                                        cache_size=cache_size))
+            assert [result["board"] for result in results] == self.BOARDS * 3
+            assert set(results[0]["words"]) == {"CAT", "DOG", "BIT"}
+            assert results[0]["score"] == 27
+            assert results[1]["words"] == {"DOG": [(0, 0), (0, 1), (0, 2)]}
+
+    def test_binary_boards_round_trip(self):
+        stream = io.BytesIO()
+        write_binary_boards(self.BOARDS, stream)
+        stream.seek(0)
+        assert list(read_binary_boards(stream)) == self.BOARDS
+
+    def test_binary_boards_errors(self):
+        for board in ([['A', 'B'], ['C']], [['A' * 256]], [['A'] * 256]):
+            stream = io.BytesIO()
+            with pytest.raises(ValueError):
+                write_binary_boards([self.BOARDS[1], board], stream)
+            assert list(read_binary_boards(io.BytesIO(stream.getvalue()))) == [self.BOARDS[1]]
+        stream = io.BytesIO()
+        write_binary_boards(self.BOARDS, stream)
+        for size in (len(stream.getvalue()) - 1, 1, 3):
+            with pytest.raises(ValueError):
+                list(read_binary_boards(io.BytesIO(stream.getvalue()[:size])))
+
+
+# noinspection Duplicates
+class TestBulkRandomizer:
+
+    def test_boards_are_reproducible(self):
+        bulk_randomizer = pytest.importorskip("bulk_randomizer")
+        codes = bulk_randomizer.randomize_boards(200, seed=7)
+        assert codes.shape == (200, 4, 4)
+        assert (codes == bulk_randomizer.randomize_boards(200, seed=7)).all()
+        assert not (codes == bulk_randomizer.randomize_boards(200, seed=8)).all()
+
+    def test_every_die_used_once(self):
+        bulk_randomizer = pytest.importorskip("bulk_randomizer")
+        faces, offsets, counts = bulk_randomizer.face_tables()
+        codes = bulk_randomizer.randomize_boards(200, seed=7)
+        for board_codes, board in zip(codes, bulk_randomizer.boards_to_lists(codes)):
+            dice = sorted(int((offsets <= code).sum()) - 1 for code in board_codes.flat)
+            assert dice == list(range(16))
+            assert [faces[code] for code in board_codes.flat] == [letters for row in board for letters in row]
+
+
+# noinspection Duplicates
+class TestBoardStats:
+
+    def test_histogram_percentiles(self):
+        board_stats = pytest.importorskip("board_stats")
+        histogram = board_stats.Histogram()
+        for value in [5, 1, 3, 3, 2, 4, 3, 3, 4, 2]:
+            histogram.add(value)
+        assert histogram.percentile(50) == 3
+        assert histogram.percentile(90) == 4
+        assert histogram.percentile(100) == 5
+        assert histogram.mean() == 3.0
+
+    def test_resumed_run_matches_full_run(self, tmp_path):
+        board_stats = pytest.importorskip("board_stats")
+        words_path = tmp_path / "words.txt"
+        words_path.write_text("TE\nTEE\nTEN\nNET\nNETS\nSET\nSETS\nSEEN\nTEES")
+        paths = dict(words_path=str(words_path), index_path=str(tmp_path / "words.idx"))
+        checkpoint_path = str(tmp_path / "stats.json")
+        full = board_stats.run_simulation(60, seed=3, batch_size=20, processes=1, **paths)
+        board_stats.run_simulation(40, seed=3, batch_size=20, processes=1, checkpoint_path=checkpoint_path, **paths)
+        resumed = board_stats.run_simulation(60, processes=1, checkpoint_path=checkpoint_path, **paths)
+        assert resumed.batches_done == 3
+        assert resumed.summary() == full.summary()
+
+    def test_resumed_partial_batch(self, tmp_path):
+        board_stats = pytest.importorskip("board_stats")
+        words_path = tmp_path / "words.txt"
+        words_path.write_text("TE\nTEE\nTEN\nNET\nNETS\nSET\nSETS\nSEEN\nTEES")
+        paths = dict(words_path=str(words_path), index_path=str(tmp_path / "words.idx"))
+        checkpoint_path = str(tmp_path / "stats.json")
+        full = board_stats.run_simulation(60, seed=3, batch_size=20, processes=1, **paths)
+        partial = board_stats.run_simulation(50, seed=3, batch_size=20, processes=1, checkpoint_path=checkpoint_path,
+                                             **paths)
+        assert (partial.boards, partial.batches_done) == (50, 2)
+        resumed = board_stats.run_simulation(60, processes=1, checkpoint_path=checkpoint_path, **paths)
+        assert (resumed.boards, resumed.batches_done) == (60, 3)
+        assert resumed.summary() == full.summary()
+
+
+# noinspection Duplicates
+class TestBoardContext:
+
+    def test_context_is_cached_by_content(self):
+        board = [['C', 'A', 'T'],
+                 ['D', 'O', 'G']]
+        assert board_context(board) is board_context([row[:] for row in board])
+        assert is_valid_path(board, [(0, 0), (0, 1), (0, 2)], {'CAT'}) == 'CAT'
+        board[0][0] = 'B'
+        assert is_valid_path(board, [(0, 0), (0, 1), (0, 2)], {'CAT'}) is None
+        assert is_valid_path(board, [(0, 0), (0, 1), (0, 2)], {'BAT'}) == 'BAT'
+
+    def test_word_on_path_checks(self):
+        context = board_context([['C', 'A', 'T'],
+                                 ['D', 'O', 'G']])
+        words = WordTrie(['CAT', 'DOG', 'COG', 'TAG'])
+        assert context.word_on_path([(1, 0), (1, 1), (1, 2)], words) == 'DOG'
+        assert context.word_on_path([(0, 0), (1, 1), (1, 2)], words) == 'COG'
+        assert context.word_on_path([(0, 2), (0, 1), (1, 2)], words) == 'TAG'
+        assert context.word_on_path([(0, 0), (1, 2)], words) is None
+        assert context.word_on_path([(0, 0), (0, 1), (0, 0)], words) is None
+        assert context.word_on_path([(0, 0), (0, 1), (0, 3)], words) is None
+
+
+# noinspection Duplicates
+class TestBoggleBoardCursor:
+
+    def test_prefix_and_word_status(self):
+        model = BoggleBoard()
+        for coord in [(0, 0), (0, 1), (0, 2)]:
+            assert model.is_valid_next_step(coord)
+            model.update_current_path(coord)
+        assert model.current_word_is_prefix()
+        assert model.current_word_is_word()  # MAD
+        assert not model.is_valid_next_step((0, 0))
+        assert not model.is_valid_next_step((2, 0))
+        model.update_current_path((0, 3))
+        assert model.current_word_is_word()  # MADE
+        model.update_current_path((1, 3))
+        assert not model.current_word_is_prefix()  # MADE~
+        assert model.undo_last_step() == (1, 3)
+        assert model.get_current_word() == "MADE"
+        assert model.submit_word() == "MADE"
+        assert model.get_score() == 16
+
+    def test_undo_multi_letter_cell(self, monkeypatch):
+        board = [['QU', 'I', 'T', 'S'],
+                 ['A', 'B', 'C', 'D'],
+                 ['E', 'F', 'G', 'H'],
+                 ['I', 'J', 'K', 'L']]
+        monkeypatch.setattr(boggle_model, "randomize_board", lambda dice_list, rows, cols: board)
+        model = BoggleBoard()
+        model.reset_board()
+        for coord in [(0, 0), (0, 1), (0, 2)]:
+            model.update_current_path(coord)
+        assert model.current_word_is_word()  # QUIT
+        model.undo_last_step()
+        model.undo_last_step()
+        assert model.get_current_word() == "QU"
+        model.undo_last_step()
+        assert model.get_current_word() == ""
+        assert not model.current_word_is_prefix()
+
+    def test_board_solution(self, monkeypatch):
+        board = [['Q', 'I', 'T', 'S'],
+                 ['A', 'B', 'C', 'D'],
+                 ['E', 'F', 'G', 'H'],
+                 ['I', 'J', 'K', 'L']]
+        monkeypatch.setattr(boggle_model, "randomize_board", lambda dice_list, rows, cols: board)
+        model = BoggleBoard(solve_in_background=True)
+        assert model.get_board_solution() is None
+        assert model.get_words_remaining() is None
+        model.reset_board()
+        solution = model.get_board_solution(wait=True)
+        assert solution["ITS"] == (((0, 1), (0, 2), (0, 3)), 9)
+        remaining = model.get_words_remaining()
+        assert remaining == len(solution)
+        for coord in [(0, 1), (0, 2), (0, 3)]:
+            model.update_current_path(coord)
+        assert model.submit_word() == "ITS"
+        assert model.get_words_remaining() == remaining - 1
+        assert model.get_found_words_count() == 1
+        for coord in [(0, 1), (0, 2), (0, 3)]:
+            model.update_current_path(coord)
+        assert model.submit_word() is None
+
+    def test_solving_is_opt_in(self, monkeypatch):
+        board = [['Q', 'I', 'T', 'S'],
+                 ['A', 'B', 'C', 'D'],
+                 ['E', 'F', 'G', 'H'],
+                 ['I', 'J', 'K', 'L']]
+        monkeypatch.setattr(boggle_model, "randomize_board", lambda dice_list, rows, cols: [row[:] for row in board])
+        model = BoggleBoard()
+        model.reset_board()
+        assert model.get_board_solution(wait=True) is None
+        assert not model.set_board_solution([['X'] * 4] * 4, {})
+        assert model.set_board_solution(board, {"ITS": (((0, 1), (0, 2), (0, 3)), 9)})
+        assert model.get_words_remaining() == 1
+        model.reset_board()
+        assert model.get_board_solution() is None
+
+    def test_reroll_while_waiting(self):
+        model = BoggleBoard(solve_in_background=True)
+        # keep the solver thread busy, so the solves of the first rerolls are cancelled before they start
+        blocker = boggle_model.BOARD_SOLVER.submit(time.sleep, 0.2)
+        model.reset_board()
+        first = BackgroundWorker()
+        results = list()
+        first.submit(lambda: model.get_board_solution(wait=True), results.append)
+        time.sleep(0.05)
+        model.reset_board()
+        model.reset_board()
+        blocker.result()
+        for _ in range(200):
+            first.drain_results()
+            if results:
+                break
+            time.sleep(0.01)
+        assert results == [None]
+        assert model.get_board_solution(wait=True) is not None
+
+
+# noinspection Duplicates
+class TestBoggleServer:
+
+    def test_game_requests(self):
+        server = BoggleServer()
+        session = server.handle_request({"op": "new"})["session"]
+        assert server.handle_request({"op": "click", "session": session, "cell": [0, 0]})["ok"]
+        assert not server.handle_request({"op": "click", "session": session, "cell": [3, 3]})["ok"]
+        assert server.handle_request({"op": "undo", "session": session}) == {"ok": True, "word": ""}
+        assert server.handle_request({"op": "submit", "session": session}) == {"word": None, "score": 0}
+        assert server.handle_request({"op": "close", "session": session}) == {"ok": True}
+        assert "error" in server.handle_request({"op": "score", "session": session})
+
+    def test_invalid_cells(self):
+        server = BoggleServer()
+        session = server.handle_request({"op": "new"})["session"]
+        for cell in ([0.0, 1.0], [0, True], [0], [0, 1, 2], "01", None, [-1, 0], [0, 4]):
+            assert "error" in server.handle_request({"op": "click", "session": session, "cell": cell})
+        assert server.handle_request({"op": "click", "session": session, "cell": [0, 0]})["ok"]
+        assert server.handle_request({"op": "undo", "session": session}) == {"ok": True, "word": ""}
+        assert server.handle_request({"op": "undo", "session": session}) == {"ok": False, "word": ""}
+
+    def test_load_round_trip(self):
+        async def run():
+            server = await BoggleServer().serve("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await run_load("127.0.0.1", port, 4, 0.2)
+
+        result = asyncio.run(run())
+        assert result["requests"] > 0
+        assert result["p50_ms"] <= result["p99_ms"]
+
+    def test_solve_fills_remaining(self):
+        server = BoggleServer(solver_processes=1)
+        try:
+            session = server.handle_request({"op": "new"})["session"]
+            assert server.handle_request({"op": "score", "session": session})["remaining"] is None
+            solved = asyncio.run(server.handle_solve({"op": "solve", "session": session}))
+            score = server.handle_request({"op": "score", "session": session})
+            assert score["remaining"] == len(solved["words"])
+        finally:
+            server.close()
+
+    def test_disconnect_closes_games(self):
+        boggle_server = BoggleServer()
+
+        async def run():
+            server = await boggle_server.serve("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                for request in ({"op": "new"}, {"op": "new"}, {"op": "close", "session": 1}):
+                    writer.write(json.dumps(request).encode() + b"\n")
+                    await reader.readline()
+                assert list(boggle_server._games) == [2]
+                writer.close()
+                await writer.wait_closed()
+                for _ in range(100):
+                    if not boggle_server._games:
+                        break
+                    await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert boggle_server._games == {}
+
+
+# noinspection Duplicates
+class TestBoardGenerator:
+
+    def test_board_passes(self):
+        board_generator = pytest.importorskip("board_generator")
+        BoardConstraints, board_passes = board_generator.BoardConstraints, board_generator.board_passes
+        board = [['C', 'A', 'T'],
+                 ['~', 'S', '~'],
+                 ['~', '~', '~']]
+        words = WordTrie(["CAT", "CATS", "AT", "SAT"])
+        assert board_passes(board, BoardConstraints(min_words=4, min_score=9 + 16 + 4 + 9), words)
+        assert not board_passes(board, BoardConstraints(min_words=5), words)
+        assert board_passes(board, BoardConstraints(required_lengths=[2, 4]), words)
+        assert not board_passes(board, BoardConstraints(required_lengths=[3, 5]), words)
+        assert board_passes(board, BoardConstraints(max_dead_cells=5), words)
+        assert not board_passes(board, BoardConstraints(max_dead_cells=4), words)
+
+    def test_generate_boards(self):
+        board_generator = pytest.importorskip("board_generator")
+        BoardConstraints, generate_boards = board_generator.BoardConstraints, board_generator.generate_boards
+        constraints = BoardConstraints(min_words=60, min_score=600, required_lengths=[6], max_dead_cells=1)
+        boards = generate_boards(5, constraints, seed=7, processes=1)
+        assert len(boards) == 5
+        assert boards == generate_boards(5, constraints, seed=7, processes=1)
+        index = load_word_index()
+        for board in boards:
+            best_paths = solve_board(board, index)
+            assert len(best_paths) >= 60
+            assert sum(len(path) ** 2 for path in best_paths.values()) >= 600
+            assert any(len(word) == 6 for word in best_paths)
+        assert generate_boards(5, BoardConstraints(min_words=10 ** 6), seed=7, processes=1, max_candidates=20) == []
+
+
+# noinspection Duplicates
+class TestGameStartup:
+
+    def test_background_worker(self):
+        worker = BackgroundWorker()
+        results = []
+        worker.submit(lambda: 1 + 1, results.append)
+        worker.submit(lambda: "done", results.append)
+        deadline = time.time() + 5
+        while len(results) < 2 and time.time() < deadline:
+            worker.drain_results()
+            time.sleep(0.01)
+        assert results == [2, "done"]
+
+    def test_failed_job_keeps_the_worker(self, capsys):
+        worker = BackgroundWorker()
+        results, errors = [], []
+        worker.submit(lambda: 1 // 0, results.append, errors.append)
+        worker.submit(lambda: [][0], results.append)
+        worker.submit(lambda: "done", results.append)
+        deadline = time.time() + 5
+        while not results and time.time() < deadline:
+            worker.drain_results()
+            time.sleep(0.01)
+        assert results == ["done"]
+        assert [type(error) for error in errors] == [ZeroDivisionError]
+        assert "IndexError" in capsys.readouterr().err
+
+    def test_sounds_without_pygame(self, monkeypatch, capsys):
+        monkeypatch.setitem(sys.modules, "pygame", None)  # makes "import pygame" raise ImportError
+        sounds = SoundCache()
+        sounds.load()
+        sounds.play("media/click.mp3")
+        assert "sounds disabled" in capsys.readouterr().err
+
+    def test_startup_profile(self):
+        profile = StartupProfile(time.perf_counter())
+        profile.mark("imports")
+        profile.mark("first_frame")
+        first_frame = profile.marks["first_frame"]
+        profile.mark("first_frame")
+        assert profile.marks["first_frame"] == first_frame
+        assert list(profile.marks) == ["imports", "first_frame"]
+        assert "target 200 ms): OK" in profile.report()
+
+
+# noinspection Duplicates
+class TestBoardSizes:
+
+    def test_dice_for_size(self):
+        assert dice_for_size(5, 5) is BIG_BOGGLE_LETTERS
+        assert len(dice_for_size(3, 7)) >= 21
+        assert len(dice_for_size(10, 12)) == 120
+        with pytest.raises(ValueError):
+            randomize_board(BIG_BOGGLE_LETTERS, 6)
+
+    def test_rectangular_board(self):
+        board = randomize_board(dice_for_size(3, 7), 3, 7)
+        assert [len(row) for row in board] == [7, 7, 7]
+        index = load_word_index()
+        for word, path in solve_board(board, index).items():
+            assert is_valid_path(board, path, index) == word
+
+    def test_large_board_model(self):
+        model = BoggleBoard(5, 6)
+        assert model.get_board_shape() == (5, 6)
+        model.reset_board()
+        assert len(model.get_chars_list()) == 30
+        assert model.is_valid_next_step((4, 5))
+        model.update_current_path((4, 5))
+        assert not model.is_valid_next_step((2, 5))
+        assert model.is_valid_next_step((3, 4))
+
+
+# noinspection Duplicates
+class TestMultiLetterCells:
+    board = [["pok", "li", "x"],
+             ["a", "QU", "it"],
+             ["e", "s", "t"]]
+    words = ["pokli", "QUit", "QUits", "QUa", "lix", "pa"]  # pa can't be formed, the p is in "pok"
+
+    def test_length_filters(self, tmp_path):
+        index_path = str(tmp_path / "words.idx")
+        compile_index(self.words, index_path)
+        for words in (self.words, WordTrie(self.words), WordIndex(index_path)):
+            # path length counts cells, word length counts letters
+            assert find_length_n_paths(2, self.board, words) == [[(0, 0), (0, 1)], [(0, 1), (0, 2)],
+                                                                 [(1, 1), (1, 0)], [(1, 1), (1, 2)]]
+            assert find_length_n_words(5, self.board, words) == [[(0, 0), (0, 1)], [(1, 1), (1, 2), (2, 1)]]
+            assert find_length_n_words(4, self.board, words) == [[(1, 1), (1, 2)]]
+            assert find_length_n_words(2, self.board, words) == []
+            assert sorted(solve_board(self.board, words)) == ["QUa", "QUit", "QUits", "lix", "pokli"]
+
+    def test_valid_path_with_trie(self):
+        trie = WordTrie(self.words)
+        assert is_valid_path(self.board, [(1, 1), (1, 2), (2, 1)], trie) == "QUits"
+        assert is_valid_path(self.board, [(1, 1), (1, 2)], trie) == "QUit"
+        assert is_valid_path(self.board, [(1, 1)], trie) is None
+        assert is_valid_path(self.board, [(0, 2), (0, 1)], trie) is None
+        assert is_valid_path(self.board, [(1, 1), (1, 2), (1, 1)], trie) is None
+
+
+# noinspection Duplicates
+class TestSolutionCache:
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'S'],
+             ['B', 'I', 'T', 'Q'],
+             ['Q', 'Q', 'Q', 'QU']]
+    words = ["CAT", "DOG", "DOGS", "BIT", "COD", "QUIT", "TOGA"]
+
+    def test_symmetries_share_an_entry(self):
+        trie = WordTrie(self.words)
+        cache = SolutionCache(trie)
+        expected = solve_board(self.board, trie)
+        for symmetry in range(len(SYMMETRIES)):
+            board = [list(row) for row in transform_board(self.board, symmetry)]
+            solved = cache.solve_board(board)
+            assert set(solved) == set(expected)
+            for word, path in solved.items():
+                assert is_valid_path(board, path, self.words) == word
+                assert len(path) == len(expected[word])
+            assert sorted(map(len, cache.max_score_paths(board))) == sorted(map(len, max_score_paths(board, trie)))
+        assert len(cache) == 1
+        assert (cache.hits, cache.misses) == (15, 1)  # 8 solve_board and 8 max_score_paths lookups
+
+    def test_rectangular_boards(self):
+        board = [['D', 'O', 'G'],
+                 ['Q', 'Q', 'S']]
+        cache = SolutionCache(WordTrie(self.words))
+        rotated = [list(row) for row in transform_board(board, 1)]
+        assert len(rotated) == 3 and len(rotated[0]) == 2
+        assert cache.solve_board(board) == {"DOG": [(0, 0), (0, 1), (0, 2)], "DOGS": [(0, 0), (0, 1), (0, 2), (1, 2)]}
+        assert cache.solve_board(rotated) == {"DOG": [(0, 1), (1, 1), (2, 1)],
+                                              "DOGS": [(0, 1), (1, 1), (2, 1), (2, 0)]}
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_jagged_boards(self):
+        board = [['A', 'B'],
+                 ['C', 'D', 'E']]
+        trie = WordTrie(["CDE", "DE", "AB"])
+        cache = SolutionCache(trie)
+        assert cache.solve_board(board) == solve_board(board, trie)
+        assert sorted(cache.solve_board(board)) == ["AB", "CDE", "DE"]
+        assert len(cache) == 0 and cache.stats()["misses"] == 0  # solved directly, never cached
+        with pytest.raises(ValueError):
+            canonical_board(board)
+
+    def test_lru_eviction(self):
+        boards = [[[letter, 'O', 'G']] for letter in 'DBCF']
+        cache = SolutionCache(WordTrie(["DOG", "BOG", "COG", "FOG"]), max_boards=2)
+        for board in boards[:3]:
+            cache.solve_board(board)
+        assert len(cache) == 2 and cache.evictions == 1
+        cache.solve_board(boards[2])  # a hit, [C O G] is the most recently used now
+        cache.solve_board(boards[3])  # evicts [B O G]
+        cache.solve_board(boards[1])
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 5, 3)
+        cache = SolutionCache(WordTrie(["DOG"]), max_cells=2)  # a solution larger than the limit isn't kept
+        cache.solve_board(boards[0])
+        assert len(cache) == 0 and cache.stats()["cells"] == 0
+
+
+# noinspection Duplicates
+class TestSearchPlanner:
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'S'],
+             ['B', 'I', 'T', 'Q'],
+             ['Q', 'Q', 'Q', 'QU']]
+    words = ["CAT", "DOG", "DOGS", "BIT", "COD", "QUIT", "TOGA", "CODA", "GOD", "ZEBRA"]
+
+    def test_plan(self):
+        assert plan_search(self.board, ["CAT", "ZEBRA"]) == WORD_FIRST
+        assert plan_search(self.board, WordTrie(self.words)) == BOARD_FIRST
+        assert plan_search(self.board, iter(self.words)) == BOARD_FIRST
+        assert plan_search([['A', ''], ['T', 'C']], ["CAT"]) == BOARD_FIRST
+
+    def test_strategies_agree(self):
+        for n in range(1, 6):
+            assert find_length_n_paths(n, self.board, self.words, WORD_FIRST) == \
+                   find_length_n_paths(n, self.board, self.words, BOARD_FIRST)
+            assert find_length_n_words(n, self.board, self.words, WORD_FIRST) == \
+                   find_length_n_words(n, self.board, self.words, BOARD_FIRST)
+        # CODA, TOGA (from both T's) and DOGS, in the order the board-first search finds them
+        assert find_length_n_words(4, self.board, self.words, WORD_FIRST) == [[(0, 0), (1, 1), (1, 0), (0, 1)],
+                                                                              [(0, 2), (1, 1), (1, 2), (0, 1)],
+                                                                              [(1, 0), (1, 1), (1, 2), (1, 3)],
+                                                                              [(2, 2), (1, 1), (1, 2), (0, 1)]]
+
+    def test_strategy_checks(self):
+        board = [['C', 'A'],
+                 ['T', '']]
+        expected = find_length_n_paths(4, board, ["CAT"], BOARD_FIRST)
+        assert len(expected) == 3
+        assert search_strategy(board, ["CAT"], WORD_FIRST) == BOARD_FIRST
+        assert find_length_n_paths(4, board, ["CAT"], WORD_FIRST) == expected
+        assert find_length_n_words(3, board, ["CAT"], WORD_FIRST) == find_length_n_words(3, board, ["CAT"], BOARD_FIRST)
+        with pytest.raises(ValueError):
+            find_length_n_paths(3, self.board, self.words, "wordfirst")
+        with pytest.raises(ValueError):
+            find_length_n_words(3, self.board, self.words, "")
+
+    def test_word_first_needs_a_collection(self):
+        trie = WordTrie(self.words)
+        for words in (trie, iter(self.words)):
+            assert search_strategy(self.board, words, WORD_FIRST) == BOARD_FIRST
+        assert find_length_n_paths(3, self.board, trie, WORD_FIRST) == find_length_n_paths(3, self.board, self.words)
+        assert find_length_n_words(4, self.board, trie, WORD_FIRST) == find_length_n_words(4, self.board, self.words)
+        assert find_length_n_words(3, self.board, iter(self.words), WORD_FIRST) == \
+               find_length_n_words(3, self.board, self.words)
+
+    def test_present_words(self):
+        present = present_words(self.board, ["ZEBRA", "BIT", "QUIT", "DOG", "DOG"])
+        assert list(present) == ["BIT", "DOG"]
+        assert present["BIT"] == [(2, 0), (2, 1), (2, 2)]
+        assert is_valid_path(self.board, present["DOG"], self.words) == "DOG"
+        assert set(present_words(self.board, WordTrie(self.words))) == set(solve_board(self.board, self.words))
+
+
+# noinspection Duplicates
+class TestLetterSignatures:
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'S'],
+             ['B', 'I', 'T', 'Q'],
+             ['Q', 'Q', 'Q', 'QU']]
+    words = ["CAT", "DOG", "DOGS", "BIT", "COD", "QUIT", "TOGA", "CODA", "GOOD", "ZEBRA", "TACIT", "QUQUQUQU"]
+
+    def test_possible_words(self):
+        LetterSignatures = pytest.importorskip("letter_signatures").LetterSignatures
+        signatures = LetterSignatures(self.words)
+        # ZEBRA has letters that aren't on the board, GOOD needs two O's and QUQUQUQU needs four U's
+        assert signatures.possible_words(self.board) == ["CAT", "DOG", "DOGS", "BIT", "COD", "QUIT", "TOGA",
+                                                         "CODA", "TACIT"]
+        assert signatures.possible_words([['QU', 'QU'], ['QU', 'QU']]) == ["QUQUQUQU"]
+        assert signatures.possible_words([['X']]) == []
+
+    def test_solvers_agree(self):
+        LetterSignatures = pytest.importorskip("letter_signatures").LetterSignatures
+        signatures = LetterSignatures(self.words + ["QUIT"])
+        assert len(signatures) == len(self.words) and "ZEBRA" in signatures and "ZEBRAS" not in signatures
+        assert solve_board(self.board, signatures) == solve_board(self.board, self.words)
+        assert max_score_paths(self.board, signatures) == max_score_paths(self.board, self.words)
+        for n in range(1, 6):
+            for strategy in (BOARD_FIRST, WORD_FIRST):
+                assert find_length_n_words(n, self.board, signatures, strategy) == \
+                       find_length_n_words(n, self.board, self.words)
+        assert is_valid_path(self.board, [(0, 0), (0, 1), (0, 2)], signatures) == "CAT"
+
+    def test_wide_alphabet(self):
+        LetterSignatures = pytest.importorskip("letter_signatures").LetterSignatures
+        # more letters than bits in the mask, the letters past the first 63 share a bit
+        alphabet = [chr(ord('Ā') + i) for i in range(80)]
+        signatures = LetterSignatures(alphabet + [alphabet[70] + alphabet[0]])
+        assert signatures.possible_words([[alphabet[0], alphabet[70]]]) == [alphabet[0], alphabet[70],
+                                                                            alphabet[70] + alphabet[0]]
+        assert signatures.possible_words([[alphabet[0], alphabet[71]]]) == [alphabet[0], alphabet[71]]
+
+    def test_numpy_not_loaded_by_the_game(self):
+        # only the callers of LetterSignatures load NumPy, the game and the solvers don't
+        code = "import sys, algos, boggle_model; print('numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
+
+
+# noinspection Duplicates
+class TestStreamingPaths:
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'S'],
+             ['B', 'I', 'T', 'Q'],
+             ['Q', 'Q', 'Q', 'QU']]
+    words = ["CAT", "DOG", "DOGS", "BIT", "COD", "QUIT", "TOGA", "CODA", "GOD", "A", "AT"]
+
+    def test_same_paths_in_order(self):
+        for n in range(1, 6):
+            assert list(iter_length_n_paths(n, self.board, self.words)) == \
+                   find_length_n_paths(n, self.board, self.words, BOARD_FIRST)
+            assert list(iter_length_n_words(n, self.board, self.words)) == \
+                   find_length_n_words(n, self.board, self.words, BOARD_FIRST)
+        found = dict(iter_word_paths(self.board, self.words))
+        assert set(found) == set(solve_board(self.board, self.words))
+        for word, path in found.items():
+            assert is_valid_path(self.board, path, self.words) == word
+
+    def test_limit_and_early_exit(self):
+        assert list(iter_length_n_words(4, self.board, self.words, limit=2)) == \
+               find_length_n_words(4, self.board, self.words)[:2]
+        assert list(iter_word_paths(self.board, self.words, limit=1)) == [("CAT", [(0, 0), (0, 1), (0, 2)])]
+        assert list(iter_length_n_paths(3, self.board, self.words, limit=0)) == []
+        paths = iter_length_n_paths(3, self.board, self.words)
+        assert next(paths) == [(0, 0), (0, 1), (0, 2)]
+        paths.close()
+        assert list(paths) == []
+
+
+# noinspection Duplicates
+class TestCountingModes:
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'S'],
+             ['B', 'I', 'T', 'Q'],
+             ['Q', 'Q', 'Q', 'QU']]
+    words = ["CAT", "DOG", "DOGS", "BIT", "COD", "QUIT", "TOGA", "CODA", "GOD", "A", "AT", "TO"]
+
+    def test_counts_match_paths(self):
+        for words in (self.words, WordTrie(self.words)):
+            for n in range(1, 6):
+                assert count_length_n_paths(n, self.board, words) == len(find_length_n_paths(n, self.board, words))
+                assert count_length_n_words(n, self.board, words) == len(find_length_n_words(n, self.board, words))
+
+    def test_histogram(self):
+        histogram = board_histogram(self.board, self.words, 2)
+        solved = solve_board(self.board, self.words)
+        assert histogram["words"] == {1: 1, 2: 2, 3: 5, 4: 3}
+        assert sum(histogram["words"].values()) == len(solved)
+        assert histogram["score"] == sum(len(path) ** 2 for path in solved.values())
+        assert histogram["paths"] == {cells: count_length_n_paths(cells, self.board, self.words)
+                                      for cells in range(1, 5)}
+        assert board_histogram([['X']], self.words, 2) == {"paths": {}, "words": {}, "score": 0}
@@ -0,0 +1,218 @@
+from typing import Iterable, Iterator, Optional
+from array import array
+from functools import lru_cache
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from word_trie import WordTrie, WORD_END
+
+WORDS_PATH = 'words.txt'
+INDEX_PATH = 'words.idx'
+INDEX_MAGIC = b'BOGLIDX1'
+# node count, row width, word count, alphabet size (in bytes), words blob size (in bytes)
+HEADER_FORMAT = '=5I'
+NO_CHILD = 0  # the root is never a child, so its id doubles as "no such child"
+
+
+#############################################################
+#                                                           #
+#                        compiling                          #
+#                                                           #
+#############################################################
+
+def compile_index(words: Iterable[str], index_path: str = INDEX_PATH) -> None:
+    """
+    Compiles the given words into a binary index file, which WordIndex can map into memory.
+    The file holds a flat table with a row per node of the compacted trie (DAWG), followed by the sorted words.
+    Column 0 of a row is 1 if the node ends a word, and column i is the id of the child reached by the i-th
+    letter of the alphabet (NO_CHILD if there is none). The root is node 0.
+
+    :param words: An iterable collection of words to compile
+    :param index_path: The path of the index file to write
+    """
+    words = sorted(set(words))
+    trie = WordTrie(words)
+    alphabet = sorted(set("".join(words)))
+    columns = {char: column for column, char in enumerate(alphabet, 1)}
+    width = len(alphabet) + 1
+
+    # number the (shared) nodes in BFS order, the root gets id 0
+    node_ids = {id(trie.root): 0}
+    nodes = [trie.root]
+    for node in nodes:
+        for char, child in node.items():
+            if char != WORD_END and id(child) not in node_ids:
+                node_ids[id(child)] = len(nodes)
+                nodes.append(child)
+
+    table = array('I', bytes(4 * width * len(nodes)))
+    for node_id, node in enumerate(nodes):
+        row = node_id * width
+        for char, child in node.items():
+            if char == WORD_END:
+                table[row] = 1
+            else:
+                table[row + columns[char]] = node_ids[id(child)]
+
+    alphabet_blob = _pad("".join(alphabet).encode())
+    words_blob = "\n".join(words).encode()
+    header = struct.pack(HEADER_FORMAT, len(nodes), width, len(words), len(alphabet_blob), len(words_blob))
+
+    # write to a temporary file first, so processes loading the index never see a half written file.
+    # every writer gets its own file, so processes compiling the same index at once don't write over each other
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(index_path) + '.', suffix='.tmp',
+                                     dir=os.path.dirname(os.path.abspath(index_path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(header)
+            f.write(alphabet_blob)
+            table.tofile(f)
+            f.write(words_blob)
+        # mkstemp makes the file private to its owner, the index is as readable as any other file
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, index_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _pad(blob: bytes) -> bytes:
+    """
+    Pads the blob with zero bytes to a multiple of 4 bytes, so the table after it stays aligned.
+    """
+    return blob + bytes(-len(blob) % 4)
+
+
+#############################################################
+#                                                           #
+#                         loading                           #
+#                                                           #
+#############################################################
+
+class WordIndex:
+    """
+    A compiled words index, memory-mapped from its file. It answers the same questions as WordTrie
+    (root, walk, is_word, in, len), with nodes being row ids of the index table.
+    Nothing is allocated per word when loading, and processes that map the same file share its memory pages.
+    """
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        """
+        Maps the given index file into memory.
+        :param index_path: The path of an index file written by compile_index
+        """
+        self._path = index_path
+        with open(index_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not a words index file")
+
+        offset = len(INDEX_MAGIC)
+        node_count, self._width, self._size, alphabet_len, words_len = \
+            struct.unpack_from(HEADER_FORMAT, self._mmap, offset)
+        offset += struct.calcsize(HEADER_FORMAT)
+        alphabet = self._mmap[offset:offset + alphabet_len].rstrip(b'\0').decode()
+        self._columns = {char: column for column, char in enumerate(alphabet, 1)}
+        offset += alphabet_len
+
+        table_len = 4 * self._width * node_count
+        self._table = memoryview(self._mmap)[offset:offset + table_len].cast('I')
+        offset += table_len
+        self._words_offset = offset
+        self._words_len = words_len
+        self.root = 0
+
+    def walk(self, node: int, chars: str) -> Optional[int]:
+        """
+        Follows the given chars down from the given node.
+        :param node: The node to start from (self.root for a new word)
+        :param chars: The letters to follow, e.g. the content of a board cell
+        :return: The node reached, or None if no word continues with these letters
+        """
+        table = self._table
+        width = self._width
+        for char in chars:
+            column = self._columns.get(char)
+            if column is None:
+                return None
+            node = table[node * width + column]
+            if node == NO_CHILD:
+                return None
+        return node
+
+    def is_word(self, node: int) -> bool:
+        """
+        :param node: A node of the index
+        :return: True if the letters leading to the node form a word
+        """
+        return self._table[node * self._width] != 0
+
+    def __contains__(self, word: object) -> bool:
+        """
+        Checks if the given word is in the index.
+        """
+        if not isinstance(word, str):
+            return False
+        node = self.walk(self.root, word)
+        return node is not None and self.is_word(node)
+
+    def __len__(self) -> int:
+        """
+        :return: The number of words in the index
+        """
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterates over the words of the index in sorted order, decoding each one only when it's reached.
+        """
+        if not self._size:
+            return
+        start = self._words_offset
+        end = start + self._words_len
+        while start <= end:
+            line_end = self._mmap.find(b'\n', start, end)
+            if line_end == -1:
+                line_end = end
+            yield self._mmap[start:line_end].decode()
+            start = line_end + 1
+
+
+def load_word_index(words_path: str = WORDS_PATH, index_path: str = INDEX_PATH) -> WordIndex:
+    """
+    Loads the index of the given words file, compiling it first if it's missing or older than the words file.
+
+    :param words_path: The path of a file containing a list of words, one word per line
+    :param index_path: The path of the compiled index of that file
+    :return: The memory-mapped WordIndex
+    """
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(words_path):
+        with open(words_path, 'r') as f:
+            compile_index((line.strip() for line in f), index_path)
+    return WordIndex(index_path)
+
+
+@lru_cache(maxsize=None)
+def shared_word_index(words_path: str = WORDS_PATH, index_path: str = INDEX_PATH) -> WordIndex:
+    """
+    Returns the process-wide index of the given words file, loading it on first use.
+    The index is read-only, so every game hosted by the process can share this single instance.
+
+    :param words_path: The path of a file containing a list of words, one word per line
+    :param index_path: The path of the compiled index of that file
+    :return: The memory-mapped WordIndex
+    """
+    return load_word_index(words_path, index_path)
+
+
+if __name__ == "__main__":
+    # usage: python word_index.py [words_path] [index_path]
+    source = sys.argv[1] if len(sys.argv) > 1 else WORDS_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else INDEX_PATH
+    with open(source, 'r') as words_file:
+        compile_index((line.strip() for line in words_file), target)
+    print(f"compiled {source} into {target} ({os.path.getsize(target)} bytes)")
@@ -0,0 +1,111 @@
+from typing import Iterable, Optional, Dict
+
+# a node is a dict of char -> child node. the empty string can never be a single char of a word,
+# so it is used as the key that marks "a word ends here"
+WORD_END = ''
+
+Node = Dict[str, object]
+
+
+class WordTrie:
+    """
+    A prefix trie over a collection of words, used by the solvers to extend a path one cell at a time.
+    Identical sub-trees (shared suffixes) are merged while building, so the structure is actually a DAWG,
+    which keeps the whole words.txt dictionary in a fraction of the memory of a prefix set.
+    The trie is read-only once built.
+    """
+
+    def __init__(self, words: Iterable[str] = (), compact: bool = True):
+        """
+        Builds the trie from the given words.
+        :param words: An iterable collection of words (a list, set, dict keys, etc.)
+        :param compact: Whether to merge shared suffixes. Merging costs extra build time, so a trie that is
+        thrown away after a single search is faster to build without it.
+        """
+        self.root: Node = dict()
+        self._size = 0
+        self._build(words, compact)
+
+    def _build(self, words: Iterable[str], compact: bool) -> None:
+        """
+        Inserts the words in sorted order, and merges every finished sub-tree with an identical registered one
+        (incremental DAWG construction). Since the words are sorted, once a word diverges from the previous word,
+        the previous word's tail will never change again and can be merged.
+        :param words: An iterable collection of words
+        :param compact: Whether to merge the finished sub-trees or leave them as they are
+        """
+        register = dict()
+        unchecked = list()  # of tuples: PARENT, CHAR, CHILD - the tail of the previous word
+        prev_word = str()
+
+        def minimize(down_to):
+            """
+            replaces every unchecked node deeper than down_to with its registered twin, or registers it
+            """
+            if not compact:
+                del unchecked[down_to:]
+                return
+            while len(unchecked) > down_to:
+                parent, char, child = unchecked.pop()
+                # children are already minimized, so their identity is enough to describe them
+                key = (tuple(child), tuple(map(id, child.values())))
+                registered = register.get(key)
+                if registered is None:
+                    register[key] = child
+                else:
+                    parent[char] = registered
+
+        for word in sorted(set(words)):
+            common = 0
+            for prev_char, char in zip(prev_word, word):
+                if prev_char != char:
+                    break
+                common += 1
+            minimize(common)
+
+            node = unchecked[-1][2] if unchecked else self.root
+            for char in word[common:]:
+                child = dict()
+                node[char] = child
+                unchecked.append((node, char, child))
+                node = child
+            node[WORD_END] = True
+            self._size += 1
+            prev_word = word
+        minimize(0)
+
+    def walk(self, node: Node, chars: str) -> Optional[Node]:
+        """
+        Follows the given chars down from the given node.
+        :param node: The node to start from (self.root for a new word)
+        :param chars: The letters to follow, e.g. the content of a board cell
+        :return: The node reached, or None if no word continues with these letters
+        """
+        for char in chars:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def is_word(node: Node) -> bool:
+        """
+        :param node: A node of the trie
+        :return: True if the letters leading to the node form a word
+        """
+        return WORD_END in node
+
+    def __contains__(self, word: object) -> bool:
+        """
+        Checks if the given word is in the trie.
+        """
+        if not isinstance(word, str):
+            return False
+        node = self.walk(self.root, word)
+        return node is not None and WORD_END in node
+
+    def __len__(self) -> int:
+        """
+        :return: The number of words in the trie
+        """
+        return self._size